@@ -1,13 +1,97 @@
 # src/config.py
 
 import os
-import json
+import atexit
+import copy
+import threading
+import weakref
 from pathlib import Path
 import logging
+import orjson
+
+# Configuración por defecto
+DEFAULT_CONFIG = {
+    "general": {
+        "startup_mode": "widget",  # widget, fullscreen
+        "always_on_top": True,
+        "check_for_updates": True,
+        "minimize_to_tray": True,  # minimizar a la bandeja del sistema en lugar de cerrar
+    },
+    "appearance": {
+        "theme": "dark",  # dark, light, system
+        "colors_from_artwork": True,
+        "font": "",  # Fuente personalizada (vacío = usar la predeterminada)
+        "show_lyrics": True,
+    },
+    "players": {
+        "spotify": {
+            "enabled": True,
+            "client_id": "",
+            "client_secret": ""
+        },
+        "windows_media": {
+            "enabled": True
+        },
+        "browsers": {
+            "enabled": True,
+            "detect_youtube": True,
+            "detect_spotify_web": True
+        }
+    },
+    "lyrics": {
+        "providers": {
+            "lrclib": {
+                "enabled": True,
+                "priority": 0  # Prioridad más alta (número menor)
+            },
+            "netease": {
+                "enabled": True,
+                "priority": 1
+            },
+            "genius": {
+                "enabled": True,
+                "priority": 2,
+                "api_key": ""
+            }
+        },
+        "cache_lyrics": True,
+        "synchronize_lyrics": True  # Intentar sincronizar letras con la reproducción
+    }
+}
+
+
+def _flatten(config, prefix=()):
+    """Aplana un diccionario anidado en una lista de (ruta, valor) para cada hoja"""
+    leaves = []
+    for key, value in config.items():
+        path = prefix + (key,)
+        if isinstance(value, dict):
+            leaves.extend(_flatten(value, path))
+        else:
+            leaves.append((path, value))
+    return leaves
+
+# Hojas de la configuración por defecto, calculadas una sola vez al importar el módulo
+_DEFAULT_LEAVES = _flatten(DEFAULT_CONFIG)
+
+# Instancias vivas de Config; el temporizador de guardado es un hilo daemon, así que al
+# terminar el intérprete se escribe lo que cada una tenga pendiente
+_LIVE_CONFIGS = weakref.WeakSet()
+
+def _flush_all():
+    """Escribe los guardados diferidos pendientes de todas las instancias"""
+    for config in list(_LIVE_CONFIGS):
+        config.flush()
+
+atexit.register(_flush_all)
 
 class Config:
     """Gestiona la configuración del widget de música"""
     
+    # Copia de la configuración ya parseada, compartida entre instancias: (mtime_ns, dict).
+    # Nadie modifica esta copia: cada instancia recibe la suya
+    _cached = None
+    
     def __init__(self):
         # Directorio de configuración
         self.config_dir = Path(os.path.expanduser("~")) / ".config" / "sunamu-windows"
@@ -16,54 +100,13 @@ class Config:
         self.lyrics_cache_dir = self.cache_dir / "lyrics"
         
         # Configuración por defecto
-        self.default_config = {
-            "general": {
-                "startup_mode": "widget",  # widget, fullscreen
-                "always_on_top": True,
-                "check_for_updates": True,
-                "minimize_to_tray": True,  # minimizar a la bandeja del sistema en lugar de cerrar
-            },
-            "appearance": {
-                "theme": "dark",  # dark, light, system
-                "colors_from_artwork": True,
-                "font": "",  # Fuente personalizada (vacío = usar la predeterminada)
-                "show_lyrics": True,
-            },
-            "players": {
-                "spotify": {
-                    "enabled": True,
-                    "client_id": "",
-                    "client_secret": ""
-                },
-                "windows_media": {
-                    "enabled": True
-                },
-                "browsers": {
-                    "enabled": True,
-                    "detect_youtube": True,
-                    "detect_spotify_web": True
-                }
-            },
-            "lyrics": {
-                "providers": {
-                    "lrclib": {
-                        "enabled": True,
-                        "priority": 0  # Prioridad más alta (número menor)
-                    },
-                    "netease": {
-                        "enabled": True,
-                        "priority": 1
-                    },
-                    "genius": {
-                        "enabled": True,
-                        "priority": 2,
-                        "api_key": ""
-                    }
-                },
-                "cache_lyrics": True,
-                "synchronize_lyrics": True  # Intentar sincronizar letras con la reproducción
-            }
-        }
+        self.default_config = DEFAULT_CONFIG
+        
+        # Guardado diferido: varias llamadas seguidas a set() generan una sola escritura
+        self.save_delay = 0.5  # segundos
+        self._save_timer = None
+        self._save_lock = threading.Lock()
+        _LIVE_CONFIGS.add(self)
         
         # Iniciar la configuración
         self._config = {}
@@ -79,35 +122,71 @@ class Config:
         # Cargar configuración existente o crear una nueva
         if self.config_file.exists():
             try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    self._config = json.load(f)
+                # Reutilizar la configuración parseada si el archivo no ha cambiado
+                mtime = self.config_file.stat().st_mtime_ns
+                if Config._cached and Config._cached[0] == mtime:
+                    self._config = copy.deepcopy(Config._cached[1])
+                    return
+                
+                with open(self.config_file, 'rb') as f:
+                    self._config = orjson.loads(f.read())
                 self._update_missing_keys()
+                Config._cached = (mtime, copy.deepcopy(self._config))
             except Exception as e:
                 logging.error(f"Error al cargar la configuración: {e}")
-                self._config = dict(self.default_config)
+                self._config = copy.deepcopy(self.default_config)
                 self.save()
         else:
-            self._config = dict(self.default_config)
+            self._config = copy.deepcopy(self.default_config)
             self.save()
     
     def _update_missing_keys(self):
         """Actualiza las claves faltantes en la configuración con valores predeterminados"""
-        def update_dict(target, source):
-            for key, value in source.items():
-                if key not in target:
-                    target[key] = value
-                elif isinstance(value, dict) and isinstance(target[key], dict):
-                    update_dict(target[key], value)
-        
-        update_dict(self._config, self.default_config)
+        for path, value in _DEFAULT_LEAVES:
+            section = self._config
+            for key in path[:-1]:
+                section = section.setdefault(key, {})
+                if not isinstance(section, dict):
+                    # El usuario sobrescribió la sección con un valor no anidado
+                    break
+            else:
+                section.setdefault(path[-1], value)
     
     def save(self):
         """Guarda la configuración actual en el archivo"""
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self._config, f, indent=4)
-        except Exception as e:
-            logging.error(f"Error al guardar la configuración: {e}")
+        # El cerrojo cubre también la escritura: un guardado del temporizador y uno explícito
+        # no pueden usar a la vez el archivo temporal
+        with self._save_lock:
+            if self._save_timer:
+                self._save_timer.cancel()
+                self._save_timer = None
+            
+            try:
+                # Escribir en un archivo temporal y reemplazar de forma atómica
+                data = orjson.dumps(self._config, option=orjson.OPT_INDENT_2)
+                tmp_file = self.config_file.with_suffix('.json.tmp')
+                tmp_file.write_bytes(data)
+                os.replace(tmp_file, self.config_file)
+                # Mantener la caché al día para no volver a parsear lo que acabamos de escribir
+                Config._cached = (self.config_file.stat().st_mtime_ns, copy.deepcopy(self._config))
+            except Exception as e:
+                logging.error(f"Error al guardar la configuración: {e}")
+    
+    def flush(self):
+        """Escribe de inmediato un guardado diferido pendiente, si lo hay"""
+        with self._save_lock:
+            pending = self._save_timer is not None
+        if pending:
+            self.save()
+    
+    def _schedule_save(self):
+        """Programa un guardado diferido para agrupar cambios consecutivos"""
+        with self._save_lock:
+            if self._save_timer:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.save_delay, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
     
     def get(self, section, key=None, default=None):
         """Obtiene un valor de configuración específico"""
@@ -123,4 +202,4 @@ class Config:
             self._config[section] = {}
         
         self._config[section][key] = value
-        self.save()
\ No newline at end of file
+        self._schedule_save()
\ No newline at end of file
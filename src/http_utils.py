@@ -0,0 +1,8 @@
+# src/http_utils.py
+
+import orjson
+
+def orjson_response_hook(response, *args, **kwargs):
+    """Hook de respuesta de requests que hace que response.json() se decodifique con orjson"""
+    response.json = lambda **_: orjson.loads(response.content)
+    return response
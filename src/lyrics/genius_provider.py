@@ -2,9 +2,80 @@
 
 import logging
 import re
+from functools import lru_cache
 from typing import Optional, List
 import lyricsgenius
 from .lyrics_provider import LyricsProvider, LyricsData, LyricLine
+from ..http_utils import orjson_response_hook
+
+# Patrones para limpiar términos de búsqueda
+_PARENS = re.compile(r'\([^)]*\)')
+_BRACKETS = re.compile(r'\[[^\]]*\]')
+_STOPWORDS = re.compile(r'\b(?:oficial|official|video|lyrics|audio|hd|4k)\b', re.IGNORECASE)
+_NONWORD = re.compile(r'[^\w\s]')
+_WS = re.compile(r'\s+')
+
+# Patrones para limpiar las letras
+_HEADER = re.compile(r'\[.*Lyrics\]')
+_ANNOT = re.compile(r'\[.*?\]')
+_LINENUM = re.compile(r'^\d+\s*')
+
+@lru_cache(maxsize=512)
+def _clean_search_term(text: str) -> str:
+    """Limpia términos de búsqueda eliminando caracteres especiales y frases entre paréntesis"""
+    if not text:
+        return ""
+    
+    # Eliminar contenido entre paréntesis
+    cleaned = _PARENS.sub('', text)
+    
+    # Eliminar contenido entre corchetes
+    cleaned = _BRACKETS.sub('', cleaned)
+    
+    # Eliminar palabras extra comunes
+    cleaned = _STOPWORDS.sub('', cleaned)
+    
+    # Eliminar caracteres no alfanuméricos excepto espacios
+    cleaned = _NONWORD.sub('', cleaned)
+    
+    # Normalizar espacios
+    cleaned = _WS.sub(' ', cleaned).strip()
+    
+    return cleaned
+
+# Las letras completas ocupan más memoria, así que se guardan menos
+@lru_cache(maxsize=64)
+def _clean_lyrics(lyrics_text: str) -> str:
+    """Limpia el texto de las letras eliminando encabezados y otros elementos"""
+    if not lyrics_text:
+        return ""
+    
+    # Eliminar la primera línea si contiene el título de la canción (típico en Genius)
+    lines = lyrics_text.split('\n')
+    start = 1 if lines and _HEADER.search(lines[0]) else 0
+    
+    # Ignorar líneas vacías al principio y al final
+    first = next((i for i in range(start, len(lines)) if lines[i].strip()), None)
+    if first is None:
+        return ""
+    last = next(i for i in range(len(lines) - 1, first - 1, -1) if lines[i].strip())
+    
+    # Eliminar anotaciones y números de línea, sin dejar líneas vacías consecutivas
+    cleaned_lines = []
+    previous_blank = False
+    for i in range(first, last + 1):
+        line = _LINENUM.sub('', _ANNOT.sub('', lines[i]))
+        
+        if not line:
+            if previous_blank:
+                continue
+            previous_blank = True
+        else:
+            previous_blank = False
+        
+        cleaned_lines.append(line)
+    
+    return '\n'.join(cleaned_lines)
 
 class GeniusProvider(LyricsProvider):
     """Proveedor de letras usando la API de Genius"""
@@ -32,6 +103,9 @@ class GeniusProvider(LyricsProvider):
                     "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
                 )
                 
+                # Decodificar las respuestas JSON de la API con orjson
+                self.genius._session.hooks["response"].append(orjson_response_hook)
+                
                 logging.info("API de Genius inicializada correctamente")
             except Exception as e:
                 logging.error(f"Error al inicializar Genius API: {e}")
@@ -50,7 +124,7 @@ class GeniusProvider(LyricsProvider):
             song = None
             search_attempts = [
                 (title, artist),  # Texto original
-                (self._clean_search_term(title), self._clean_search_term(artist)),  # Limpio
+                (_clean_search_term(title), _clean_search_term(artist)),  # Limpio
                 (title, ""),      # Solo título
                 (f"{title} {artist}", "")  # Combinado como una sola consulta
             ]
@@ -76,7 +150,7 @@ class GeniusProvider(LyricsProvider):
             lyrics_text = song.lyrics
             
             # Limpiar las letras (eliminar encabezados, etc.)
-            lyrics_text = self._clean_lyrics(lyrics_text)
+            lyrics_text = _clean_lyrics(lyrics_text)
             
             # Dividir las letras en líneas
             lines = self._parse_lyrics_lines(lyrics_text)
@@ -95,77 +169,10 @@ class GeniusProvider(LyricsProvider):
             logging.error(f"Error al obtener letras de Genius: {e}")
             return None
     
-    def _clean_search_term(self, text: str) -> str:
-        """Limpia términos de búsqueda eliminando caracteres especiales y frases entre paréntesis"""
-        if not text:
-            return ""
-        
-        # Eliminar contenido entre paréntesis
-        cleaned = re.sub(r'\([^)]*\)', '', text)
-        
-        # Eliminar contenido entre corchetes
-        cleaned = re.sub(r'\[[^\]]*\]', '', cleaned)
-        
-        # Eliminar caracteres especiales y palabras extra comunes
-        for word in ["oficial", "official", "video", "lyrics", "audio", "hd", "4k"]:
-            cleaned = re.sub(r'\b' + word + r'\b', '', cleaned, flags=re.IGNORECASE)
-        
-        # Eliminar caracteres no alfanuméricos excepto espacios
-        cleaned = re.sub(r'[^\w\s]', '', cleaned)
-        
-        # Normalizar espacios
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-        
-        return cleaned
-    
-    def _clean_lyrics(self, lyrics_text: str) -> str:
-        """Limpia el texto de las letras eliminando encabezados y otros elementos"""
-        if not lyrics_text:
-            return ""
-        
-        # Eliminar la primera línea si contiene el título de la canción (típico en Genius)
-        lines = lyrics_text.split('\n')
-        if len(lines) > 0 and re.search(r'\[.*Lyrics\]', lines[0]):
-            lines = lines[1:]
-        
-        # Eliminar líneas vacías al principio y al final
-        while lines and not lines[0].strip():
-            lines.pop(0)
-        while lines and not lines[-1].strip():
-            lines.pop()
-        
-        # Eliminar anotaciones y números de línea
-        filtered_lines = []
-        for line in lines:
-            # Eliminar anotaciones entre corchetes
-            line = re.sub(r'\[.*?\]', '', line)
-            
-            # Eliminar números de línea al principio de la línea
-            line = re.sub(r'^\d+\s*', '', line)
-            
-            filtered_lines.append(line)
-        
-        # Reconstruir el texto
-        cleaned_lyrics = '\n'.join(filtered_lines)
-        
-        # Eliminar múltiples líneas vacías consecutivas
-        cleaned_lyrics = re.sub(r'\n{3,}', '\n\n', cleaned_lyrics)
-        
-        return cleaned_lyrics
-    
     def _parse_lyrics_lines(self, lyrics_text: str) -> List[LyricLine]:
         """Divide el texto de las letras en líneas"""
         if not lyrics_text:
             return []
         
-        lines = []
-        for line_text in lyrics_text.split('\n'):
-            # Ignorar líneas vacías
-            if not line_text.strip():
-                continue
-                
-            # Crear línea de letras
-            line = LyricLine(text=line_text)
-            lines.append(line)
-        
-        return lines
\ No newline at end of file
+        # Una línea de letras por cada línea no vacía
+        return [LyricLine(text=line_text) for line_text in lyrics_text.split('\n') if line_text.strip()]
\ No newline at end of file
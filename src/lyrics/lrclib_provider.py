@@ -3,22 +3,42 @@
 import logging
 import re
 import json
+from operator import itemgetter
 from typing import Optional, List, Dict, Any
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .lyrics_provider import LyricsProvider, LyricsData, LyricLine
 
+# Marca de tiempo LRC [MM:SS.xx] al inicio de una línea, seguida del texto
+_LRC_LINE = re.compile(r'^[ \t]*\[(\d+):(\d+)[.:](\d+)\]([^\n]*)', re.MULTILINE)
+
 class LRCLibProvider(LyricsProvider):
     """Proveedor de letras usando la API de LRCLIB.net"""
     
     def __init__(self, cache_dir: str = None):
         super().__init__("LRCLib", cache_dir)
         self.base_url = "https://lrclib.net/api"
-        self.debug = True  # Activar modo debug
+        self._logger = logging.getLogger("lrclib")
+        self.timeout = (3, 10)  # (conexión, lectura) en segundos
+        
+        # Sesión compartida para reutilizar la conexión entre búsqueda y descarga
+        self._session = requests.Session()
+        self._session.headers.update({
+            "User-Agent": "Sunamu-Windows/1.0.0",  # LRCLIB pide identificar al cliente
+            "Accept-Encoding": "gzip"
+        })
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        )
+        self._session.mount("https://", adapter)
     
     def _fetch_lyrics(self, title: str, artist: str, album: str = "") -> Optional[LyricsData]:
         """Obtiene letras de canciones de LRCLIB.net"""
         try:
-            self._log_debug(f"Buscando letras para: {artist} - {title}")
+            self._logger.debug("Buscando letras para: %s - %s", artist, title)
             
             # Buscar las letras
             lyrics_data = self._search_lyrics(title, artist, album)
@@ -26,13 +46,13 @@ class LRCLibProvider(LyricsProvider):
                 logging.info(f"No se encontraron letras en LRCLIB para: {artist} - {title}")
                 return None
             
-            self._log_debug(f"Letras encontradas en LRCLIB")
+            self._logger.debug("Letras encontradas en LRCLIB")
             
             # Verificar si hay letras sincronizadas disponibles
             synced_lyrics = lyrics_data.get("syncedLyrics")
             
             has_synced_lyrics = synced_lyrics is not None and len(synced_lyrics.strip()) > 0
-            self._log_debug(f"Tiene letras sincronizadas: {has_synced_lyrics}")
+            self._logger.debug("Tiene letras sincronizadas: %s", has_synced_lyrics)
             
             # Obtener las letras (sincronizadas o no)
             if has_synced_lyrics:
@@ -56,8 +76,7 @@ class LRCLibProvider(LyricsProvider):
             
         except Exception as e:
             logging.error(f"Error al obtener letras de LRCLIB: {e}")
-            import traceback
-            self._log_debug(f"Traza de error: {traceback.format_exc()}")
+            self._logger.debug("Traza de error", exc_info=True)
             return None
     
     def _search_lyrics(self, title: str, artist: str, album: str = "") -> Optional[Dict[str, Any]]:
@@ -72,34 +91,50 @@ class LRCLibProvider(LyricsProvider):
             if album:
                 params["album_name"] = album
                 
-            self._log_debug(f"Parámetros de búsqueda: {params}")
+            self._logger.debug("Parámetros de búsqueda: %s", params)
+            
+            # Intentar primero la coincidencia directa, que ya incluye las letras
+            url = f"{self.base_url}/get"
+            self._logger.debug("URL de coincidencia directa: %s", url)
             
-            # Realizar solicitud de búsqueda
+            response = self._session.get(url, params=params, timeout=self.timeout)
+            self._logger.debug("Código de respuesta: %s", response.status_code)
+            
+            if response.status_code == 200:
+                lyrics_data = response.json()
+                if lyrics_data:
+                    return lyrics_data
+            
+            # Sin coincidencia directa, recurrir a la búsqueda
             url = f"{self.base_url}/search"
-            self._log_debug(f"URL de búsqueda: {url}")
+            self._logger.debug("URL de búsqueda: %s", url)
             
-            response = requests.get(url, params=params)
-            self._log_debug(f"Código de respuesta: {response.status_code}")
+            response = self._session.get(url, params=params, timeout=self.timeout)
+            self._logger.debug("Código de respuesta: %s", response.status_code)
             
             if response.status_code != 200:
-                self._log_debug(f"Error en respuesta HTTP: {response.status_code}")
+                self._logger.debug("Error en respuesta HTTP: %s", response.status_code)
                 return None
             
             # Analizar resultados
             results = response.json()
             
             if not results or len(results) == 0:
-                self._log_debug("No se encontraron resultados")
+                self._logger.debug("No se encontraron resultados")
                 return None
             
             # Tomar el primer resultado
             first_result = results[0]
-            self._log_debug(f"Resultado encontrado: {first_result.get('trackName')} - {first_result.get('artistName')}")
+            self._logger.debug("Resultado encontrado: %s - %s", first_result.get("trackName"), first_result.get("artistName"))
+            
+            # Los resultados de búsqueda ya traen las letras, no hace falta pedirlas de nuevo
+            if first_result.get("syncedLyrics") or first_result.get("plainLyrics"):
+                return first_result
             
-            # Ahora obtenemos la información completa usando el ID del resultado
+            # Si faltan, obtener la información completa usando el ID del resultado
             track_id = first_result.get("id")
             if not track_id:
-                self._log_debug("No se encontró ID de pista en el resultado")
+                self._logger.debug("No se encontró ID de pista en el resultado")
                 return None
                 
             # Obtener detalles completos de la canción usando el ID
@@ -108,98 +143,74 @@ class LRCLibProvider(LyricsProvider):
             
         except Exception as e:
             logging.error(f"Error en búsqueda LRCLIB: {e}")
-            import traceback
-            self._log_debug(f"Traza de error en búsqueda: {traceback.format_exc()}")
+            self._logger.debug("Traza de error en búsqueda", exc_info=True)
             return None
     
     def _get_lyrics_by_id(self, track_id: int) -> Optional[Dict[str, Any]]:
         """Obtiene letras de LRCLIB por ID de canción"""
         try:
             url = f"{self.base_url}/get/{track_id}"
-            self._log_debug(f"Obteniendo letras con URL: {url}")
+            self._logger.debug("Obteniendo letras con URL: %s", url)
             
-            response = requests.get(url)
+            response = self._session.get(url, timeout=self.timeout)
             
             if response.status_code != 200:
-                self._log_debug(f"Error al obtener letras con ID {track_id}: {response.status_code}")
+                self._logger.debug("Error al obtener letras con ID %s: %s", track_id, response.status_code)
                 return None
             
             lyrics_data = response.json()
             
             if not lyrics_data:
-                self._log_debug(f"No se encontraron datos de letras para el ID {track_id}")
+                self._logger.debug("No se encontraron datos de letras para el ID %s", track_id)
                 return None
                 
             return lyrics_data
             
         except Exception as e:
             logging.error(f"Error al obtener letras por ID de LRCLIB: {e}")
-            import traceback
-            self._log_debug(f"Traza de error: {traceback.format_exc()}")
+            self._logger.debug("Traza de error", exc_info=True)
             return None
     
     def _parse_lrc_format(self, lrc_text: str) -> List[LyricLine]:
         """Parsea letras en formato LRC y las convierte a líneas sincronizadas"""
-        lines = []
         if not lrc_text:
-            return lines
+            return []
         
-        # Patrón para buscar tiempos en formato LRC [MM:SS.ms]
-        lrc_pattern = re.compile(r'\[(\d+):(\d+)\.(\d+)\](.*)')
+        # Un único recorrido del documento completo, sin dividirlo en líneas
+        entries = []
+        previous_start = -1
+        needs_sort = False
+        for minutes, seconds, fraction, text in _LRC_LINE.findall(lrc_text):
+            # Algunos LRC usan centésimas (2 dígitos) y otros milisegundos (3 dígitos)
+            milliseconds = int(fraction) * 10 if len(fraction) == 2 else int(fraction)
+            start_time_ms = int(minutes) * 60000 + int(seconds) * 1000 + milliseconds
+            entries.append((start_time_ms, text.strip()))
+            
+            # LRCLIB casi siempre entrega las marcas en orden; solo ordenar si no es así
+            needs_sort = needs_sort or start_time_ms < previous_start
+            previous_start = start_time_ms
         
-        for line in lrc_text.strip().split('\n'):
-            match = lrc_pattern.match(line)
-            if match:
-                try:
-                    minutes, seconds, milliseconds, text = match.groups()
-                    # Convertir a milisegundos para el formato interno
-                    # Asegurarse de que milliseconds tenga 2 dígitos (algunos LRC usan 2 dígitos, otros 3)
-                    if len(milliseconds) == 2:
-                        milliseconds = int(milliseconds) * 10
-                    else:
-                        milliseconds = int(milliseconds)
-                        
-                    start_time_ms = (int(minutes) * 60 * 1000) + (int(seconds) * 1000) + milliseconds
-                    
-                    # Crear línea sincronizada
-                    lyric_line = LyricLine(
-                        text=text.strip(),
-                        start_time_ms=start_time_ms,
-                        end_time_ms=start_time_ms + 5000  # Valor temporal hasta que se ajuste
-                    )
-                    lines.append(lyric_line)
-                except Exception as e:
-                    self._log_debug(f"Error al parsear línea LRC: {line}, error: {e}")
+        if not entries:
+            return []
         
         # Ordenar las líneas por tiempo
-        lines.sort(key=lambda x: x.start_time_ms)
-        
-        # Ajustar los tiempos finales basados en las líneas siguientes
-        for i in range(len(lines) - 1):
-            lines[i].end_time_ms = lines[i+1].start_time_ms
+        if needs_sort:
+            entries.sort(key=itemgetter(0))
         
-        # Para la última línea, dejar el valor por defecto
+        # Cada línea termina donde empieza la siguiente; la última dura 5 segundos
+        end_times = [start for start, _ in entries[1:]]
+        end_times.append(entries[-1][0] + 5000)
         
-        return lines
+        return [
+            LyricLine(text=text, start_time_ms=start, end_time_ms=end)
+            for (start, text), end in zip(entries, end_times)
+        ]
     
     def _parse_lyrics_lines(self, lyrics_text: str) -> List[LyricLine]:
         """Divide el texto de las letras no sincronizadas en líneas"""
         if not lyrics_text:
             return []
         
-        lines = []
-        for line_text in lyrics_text.split('\n'):
-            # Ignorar líneas vacías
-            if not line_text.strip():
-                continue
-                
-            # Crear línea de letras
-            line = LyricLine(text=line_text)
-            lines.append(line)
-        
-        return lines
-        
-    def _log_debug(self, message: str) -> None:
-        """Registra mensajes de depuración si el modo debug está activado"""
-        if self.debug:
-            logging.debug(f"[LRCLib] {message}") 
\ No newline at end of file
+        # Una línea de letras por cada línea no vacía
+        return [LyricLine(text=line_text) for line_text in lyrics_text.split('\n') if line_text.strip()]
+ 
\ No newline at end of file
@@ -1,42 +1,119 @@
+import bisect
 import logging
-from typing import List, Optional, Dict, Any
-from .lyrics_provider import LyricsProvider, LyricsData
+import sqlite3
+import sys
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import List, Optional, Dict, Any, Tuple
+import orjson
+from .lyrics_provider import (
+    LyricsProvider, LyricsData, _CACHE_DB_LOCK, _cache_key, _get_cache_db, _is_cached_song
+)
+
+# Hilos para consultar los proveedores en paralelo (hay pocos proveedores)
+_PROVIDER_WORKERS = 4
 
 class LyricsManager:
     """Gestiona múltiples proveedores de letras con sistema de prioridad"""
     
-    def __init__(self):
-        self.providers: List[LyricsProvider] = []
+    def __init__(self, cache_dir: str = None):
+        # Proveedores ordenados como tuplas (prioridad, orden de registro, proveedor)
+        self._sorted: List[Tuple[int, int, LyricsProvider]] = []
+        self._seq = 0
         self.provider_priority: Dict[str, int] = {}
         self.default_priority = 999  # Valor por defecto para proveedores sin prioridad específica
         
-        # Caché en memoria para evitar búsquedas repetidas
-        self.memory_cache: Dict[str, LyricsData] = {}
+        # Caché en memoria (LRU acotada) para evitar búsquedas repetidas
+        self.memory_cache: "OrderedDict[Tuple[str, str], LyricsData]" = OrderedDict()
+        self._cache_max = 256
+        
+        # Hilo dedicado a las búsquedas asíncronas (get_lyrics_async)
+        self._lookup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lyrics-lookup")
+        # Hilos compartidos por todas las búsquedas para consultar los proveedores; una consulta
+        # abandonada ocupa un hilo hasta terminar en lugar de dejar hilos sueltos
+        self._provider_executor = ThreadPoolExecutor(
+            max_workers=_PROVIDER_WORKERS, thread_name_prefix="lyrics"
+        )
+        
+        # Caché persistente en disco: la misma base de datos (y esquema) que usan los proveedores
+        self.cache_dir = cache_dir
+    
+    def _load_from_disk(self, title: str, artist: str) -> Optional[LyricsData]:
+        """Busca letras en la caché en disco compartida con los proveedores"""
+        if not self.cache_dir:
+            return None
+        
+        try:
+            db = _get_cache_db(self.cache_dir)
+            key = _cache_key(title, artist)
+            # Primero las letras guardadas por los proveedores, con la misma comprobación
+            # de colisiones que hacen ellos
+            with _CACHE_DB_LOCK:
+                row = db.execute("SELECT v FROM lyrics WHERE k = ?", (key,)).fetchone()
+            if row:
+                data = orjson.loads(row[0])
+                if _is_cached_song(data, title, artist):
+                    return LyricsData.from_dict(data)
+                logging.warning(f"La caché de letras no coincide con la canción pedida: {artist} - {title}")
+            
+            # Después, las resueltas para esta petición (su título/artista difiere por definición)
+            with _CACHE_DB_LOCK:
+                row = db.execute("SELECT v FROM resolved WHERE k = ?", (key,)).fetchone()
+            if row:
+                return LyricsData.from_dict(orjson.loads(row[0]))
+        except (sqlite3.Error, orjson.JSONDecodeError) as e:
+            logging.error(f"Error al leer la caché de letras en disco: {e}")
+        
+        return None
+    
+    def _save_to_disk(self, title: str, artist: str, lyrics: LyricsData) -> None:
+        """Guarda letras en la caché en disco, una sola vez por canción"""
+        if not self.cache_dir:
+            return
+        
+        # Si la canción encontrada es la pedida, la entrada es la misma que guarda el proveedor
+        # (INSERT OR IGNORE no la duplica); si no, va a la tabla de resultados por petición
+        same_song = (lyrics.title.strip().casefold() == title.strip().casefold() and
+                     lyrics.artist.strip().casefold() == artist.strip().casefold())
+        statement = ("INSERT OR IGNORE INTO lyrics (k, v) VALUES (?, ?)" if same_song else
+                     "INSERT OR REPLACE INTO resolved (k, v) VALUES (?, ?)")
+        
+        try:
+            db = _get_cache_db(self.cache_dir)
+            with _CACHE_DB_LOCK:
+                db.execute(statement, (_cache_key(title, artist), orjson.dumps(lyrics.to_dict())))
+        except sqlite3.Error as e:
+            logging.error(f"Error al guardar en la caché de letras en disco: {e}")
+    
+    @property
+    def providers(self) -> List[LyricsProvider]:
+        """Proveedores registrados, ordenados por prioridad"""
+        return [provider for _, _, provider in self._sorted]
     
     def register_provider(self, provider: LyricsProvider, priority: int = None) -> None:
         """
         Registra un proveedor de letras con una prioridad opcional
         Prioridad más baja = mayor preferencia (0 es la máxima prioridad)
         """
-        self.providers.append(provider)
-        
         if priority is not None:
             self.provider_priority[provider.name] = priority
-            
-        # Ordenar proveedores por prioridad
-        self._sort_providers()
+        
+        # Guardar la prioridad en el propio proveedor e insertarlo directamente en su posición
+        provider._priority = self.provider_priority.get(provider.name, self.default_priority)
+        bisect.insort(self._sorted, (provider._priority, self._seq, provider))
+        self._seq += 1
         
         logging.info(f"Proveedor de letras '{provider.name}' registrado con prioridad {priority}")
     
     def _sort_providers(self) -> None:
-        """Ordena los proveedores por prioridad"""
-        self.providers.sort(
-            key=lambda p: self.provider_priority.get(p.name, self.default_priority)
+        """Reordena los proveedores por prioridad, conservando el orden de registro en los empates"""
+        self._sorted = sorted(
+            (provider._priority, seq, provider) for _, seq, provider in self._sorted
         )
     
-    def _get_cache_key(self, title: str, artist: str) -> str:
+    def _get_cache_key(self, title: str, artist: str) -> Tuple[str, str]:
         """Genera una clave única para la caché"""
-        return f"{artist.lower()}_{title.lower()}"
+        return (sys.intern(artist.lower()), sys.intern(title.lower()))
     
     def get_lyrics(self, title: str, artist: str, album: str = "") -> Optional[LyricsData]:
         """
@@ -46,40 +123,111 @@ class LyricsManager:
         if not title or not artist:
             return None
             
-        if not self.providers:
+        if not self._sorted:
             logging.warning("No hay proveedores de letras registrados")
             return None
         
         # Verificar primero en la caché en memoria
         cache_key = self._get_cache_key(title, artist)
-        if cache_key in self.memory_cache:
-            cached_lyrics = self.memory_cache[cache_key]
+        cached_lyrics = self.memory_cache.get(cache_key)
+        if cached_lyrics is not None:
+            self.memory_cache.move_to_end(cache_key)
             logging.info(f"Letras encontradas en caché en memoria para: {artist} - {title}")
             return cached_lyrics
         
+        # Después, en la caché en disco
+        cached_lyrics = self._load_from_disk(title, artist)
+        if cached_lyrics and cached_lyrics.is_valid():
+            logging.info(f"Letras encontradas en caché en disco para: {artist} - {title}")
+            self._remember(cache_key, cached_lyrics)
+            return cached_lyrics
+        
         # Registrar búsqueda
         logging.info(f"Buscando letras para: {artist} - {title}")
         
-        # Intentar con cada proveedor en orden de prioridad
-        for provider in self.providers:
-            try:
-                logging.info(f"Intentando con proveedor: {provider.name}")
-                lyrics = provider.get_lyrics(title, artist, album)
-                
-                if lyrics and lyrics.is_valid():
-                    logging.info(f"Letras encontradas en {provider.name}")
-                    
-                    # Guardar en la caché en memoria
-                    self.memory_cache[cache_key] = lyrics
-                    
-                    return lyrics
-                    
-            except Exception as e:
-                logging.error(f"Error al obtener letras de {provider.name}: {e}")
+        # Consultar todos los proveedores en paralelo, respetando su orden de prioridad
+        lyrics = self._query_providers(title, artist, album)
+        if lyrics:
+            # Guardar en la caché en memoria y en disco
+            self._remember(cache_key, lyrics)
+            self._save_to_disk(title, artist, lyrics)
+            return lyrics
         
         logging.warning(f"No se encontraron letras para: {artist} - {title} en ningún proveedor")
         return None
     
+    def _remember(self, cache_key: Tuple[str, str], lyrics: LyricsData) -> None:
+        """Guarda letras en la caché en memoria, descartando las menos usadas si se llena"""
+        self.memory_cache[cache_key] = lyrics
+        if len(self.memory_cache) > self._cache_max:
+            self.memory_cache.popitem(last=False)
+    
+    def get_lyrics_async(self, title: str, artist: str, album: str = "") -> "Future[Optional[LyricsData]]":
+        """
+        Versión no bloqueante de get_lyrics: realiza la búsqueda en un hilo aparte
+        y devuelve un Future con el resultado
+        """
+        return self._lookup_executor.submit(self.get_lyrics, title, artist, album)
+    
+    def _query_provider(self, provider: LyricsProvider, title: str, artist: str, album: str) -> Optional[LyricsData]:
+        """Consulta un único proveedor y devuelve sus letras si son válidas"""
+        try:
+            logging.info(f"Intentando con proveedor: {provider.name}")
+            lyrics = provider.get_lyrics(title, artist, album)
+            if lyrics and lyrics.is_valid():
+                return lyrics
+        except Exception as e:
+            logging.error(f"Error al obtener letras de {provider.name}: {e}")
+        
+        return None
+    
+    def _query_providers(self, title: str, artist: str, album: str) -> Optional[LyricsData]:
+        """
+        Lanza todos los proveedores a la vez y devuelve el resultado válido de mayor
+        prioridad en cuanto todos los proveedores más prioritarios hayan terminado
+        """
+        providers = self.providers
+        
+        # Con un solo proveedor no tiene sentido crear hilos
+        if len(providers) == 1:
+            lyrics = self._query_provider(providers[0], title, artist, album)
+            if lyrics:
+                logging.info(f"Letras encontradas en {providers[0].name}")
+            return lyrics
+        
+        results: List[Optional[LyricsData]] = [None] * len(providers)
+        finished = [False] * len(providers)
+        
+        futures = {
+            self._provider_executor.submit(self._query_provider, provider, title, artist, album): index
+            for index, provider in enumerate(providers)
+        }
+        try:
+            for future in as_completed(futures):
+                index = futures[future]
+                results[index] = future.result()
+                finished[index] = True
+                
+                # El primer proveedor (por prioridad) que no haya fallado decide
+                for i, provider in enumerate(providers):
+                    if not finished[i]:
+                        break
+                    if results[i]:
+                        logging.info(f"Letras encontradas en {provider.name}")
+                        return results[i]
+        finally:
+            # No esperar a los proveedores de menor prioridad: se descartan los que aún no
+            # han empezado y los que siguen en curso terminan en su hilo sin que nadie los espere
+            for future in futures:
+                future.cancel()
+        
+        return None
+    
+    def stop(self) -> None:
+        """Detiene los hilos de búsqueda (al cerrar la aplicación)"""
+        self._lookup_executor.shutdown(wait=False, cancel_futures=True)
+        self._provider_executor.shutdown(wait=False, cancel_futures=True)
+    
     def clear_cache(self) -> None:
         """Limpia la caché en memoria"""
         self.memory_cache.clear()
@@ -87,9 +235,10 @@ class LyricsManager:
     
     def set_provider_priority(self, provider_name: str, priority: int) -> bool:
         """Establece la prioridad de un proveedor específico"""
-        for provider in self.providers:
+        for _, _, provider in self._sorted:
             if provider.name == provider_name:
                 self.provider_priority[provider_name] = priority
+                provider._priority = priority
                 self._sort_providers()
                 return True
                 
@@ -98,6 +247,6 @@ class LyricsManager:
     def get_provider_priorities(self) -> Dict[str, int]:
         """Devuelve un diccionario con las prioridades de todos los proveedores"""
         result = {}
-        for provider in self.providers:
-            result[provider.name] = self.provider_priority.get(provider.name, self.default_priority)
+        for _, _, provider in self._sorted:
+            result[provider.name] = provider._priority
         return result 
\ No newline at end of file
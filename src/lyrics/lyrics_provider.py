@@ -2,13 +2,66 @@
 
 from abc import ABC, abstractmethod
 import os
-import json
+import atexit
+import bisect
 import logging
 import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, List, Tuple
+import orjson
+
+# Hash rápido (no criptográfico) de 128 bits para las claves de caché
+try:
+    from xxhash import xxh128_hexdigest as _fast_hash
+except ImportError:
+    def _fast_hash(data: bytes) -> str:
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+# Hilo compartido para escribir la caché en disco sin bloquear la búsqueda
+_CACHE_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lyrics-cache")
+atexit.register(_CACHE_POOL.shutdown, wait=True)
+
+# Una base de datos SQLite por directorio de caché, compartida por todos los proveedores
+_CACHE_DBS: Dict[str, sqlite3.Connection] = {}
+_CACHE_DB_LOCK = threading.Lock()
+
+def _get_cache_db(cache_dir: str) -> sqlite3.Connection:
+    """Abre (o reutiliza) la base de datos de la caché de letras de un directorio"""
+    with _CACHE_DB_LOCK:
+        db = _CACHE_DBS.get(cache_dir)
+        if db is None:
+            os.makedirs(cache_dir, exist_ok=True)
+            db = sqlite3.connect(
+                os.path.join(cache_dir, "lyrics.db"),
+                isolation_level=None,
+                check_same_thread=False
+            )
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS lyrics (k TEXT PRIMARY KEY, v BLOB)")
+            # Resultados de LyricsManager cuya canción encontrada tiene otro título/artista que el
+            # pedido (p. ej., un alias): la tabla lyrics no puede resolverlos con la clave de la petición
+            db.execute("CREATE TABLE IF NOT EXISTS resolved (k TEXT PRIMARY KEY, v BLOB)")
+            _CACHE_DBS[cache_dir] = db
+        return db
+
+def _cache_key(title: str, artist: str) -> str:
+    """Clave de la caché en disco para una canción (hash del artista y el título normalizados)"""
+    key = f"{artist}\x1f{title}".lower()
+    return _fast_hash(key.encode('utf-8'))
+
+def _is_cached_song(data: Dict, title: str, artist: str) -> bool:
+    """Comprueba que una entrada de la caché corresponde a la canción pedida y no a una colisión"""
+    return (data.get("title", "").strip().casefold() == title.strip().casefold() and
+            data.get("artist", "").strip().casefold() == artist.strip().casefold())
 
 class LyricLine:
     """Representa una línea de letra con tiempo de sincronización opcional"""
+    __slots__ = ("text", "start_time_ms", "end_time_ms")
+    
     def __init__(self, text: str, start_time_ms: int = -1, end_time_ms: int = -1):
         self.text = text
         self.start_time_ms = start_time_ms
@@ -37,6 +90,9 @@ class LyricLine:
 
 class LyricsData:
     """Contiene las letras de una canción"""
+    __slots__ = ("title", "artist", "album", "lyrics_text", "_lines", "source", "has_synced_lyrics",
+                 "_starts", "_synced_index")
+    
     def __init__(self, 
                  title: str = "", 
                  artist: str = "", 
@@ -53,6 +109,26 @@ class LyricsData:
         self.source = source
         self.has_synced_lyrics = has_synced_lyrics
     
+    @property
+    def lines(self) -> List[LyricLine]:
+        """Líneas de la letra"""
+        return self._lines
+    
+    @lines.setter
+    def lines(self, value: List[LyricLine]) -> None:
+        self._lines = value
+        # Invalidar el índice de búsqueda por tiempo
+        self._starts = None
+        self._synced_index = None
+    
+    def _build_time_index(self) -> None:
+        """Construye la lista ordenada de inicios de las líneas sincronizadas y sus índices"""
+        synced = sorted(
+            (line.start_time_ms, i) for i, line in enumerate(self._lines) if line.is_synced()
+        )
+        self._starts = [start for start, _ in synced]
+        self._synced_index = [i for _, i in synced]
+    
     def to_dict(self) -> Dict:
         """Convierte los datos a un diccionario"""
         return {
@@ -86,12 +162,18 @@ class LyricsData:
         if not self.has_synced_lyrics:
             return None, -1
         
-        for i, line in enumerate(self.lines):
-            if not line.is_synced():
-                continue
-                
-            if line.start_time_ms <= position_ms <= line.end_time_ms:
-                return line, i
+        if self._starts is None:
+            self._build_time_index()
+        
+        # Última línea que empieza antes de la posición actual
+        idx = bisect.bisect_right(self._starts, position_ms) - 1
+        if idx < 0:
+            return None, -1
+        
+        i = self._synced_index[idx]
+        line = self._lines[i]
+        if line.end_time_ms >= position_ms:
+            return line, i
         
         return None, -1
     
@@ -105,26 +187,50 @@ class LyricsProvider(ABC):
     def __init__(self, name: str, cache_dir: str = None):
         self.name = name
         self.cache_dir = cache_dir
+        
+        # Caché en memoria (LRU) delante de la caché en disco; LyricsManager puede consultar
+        # el mismo proveedor desde varios hilos a la vez, así que se accede bajo un cerrojo
+        self._mem_cache: "OrderedDict[Tuple[str, str], LyricsData]" = OrderedDict()
+        self._mem_cache_max = 64
+        self._mem_cache_lock = threading.Lock()
     
     def get_lyrics(self, title: str, artist: str, album: str = "") -> Optional[LyricsData]:
         """
-        Obtiene las letras de una canción, primero del caché y luego de la fuente
+        Obtiene las letras de una canción, primero de la memoria, luego del caché y por último de la fuente
         """
+        # Comprobar primero la caché en memoria, sin tocar el disco
+        key = (title.casefold(), artist.casefold())
+        with self._mem_cache_lock:
+            cached_lyrics = self._mem_cache.get(key)
+            if cached_lyrics is not None:
+                self._mem_cache.move_to_end(key)
+        if cached_lyrics is not None:
+            return cached_lyrics
+        
         # Intentar cargar desde la caché
         cached_lyrics = self._load_from_cache(title, artist)
         if cached_lyrics and cached_lyrics.is_valid():
+            self._remember(key, cached_lyrics)
             return cached_lyrics
         
         # Obtener letras de la fuente
         lyrics = self._fetch_lyrics(title, artist, album)
         if lyrics and lyrics.is_valid():
             # Guardar en caché
+            self._remember(key, lyrics)
             if self.cache_dir:
-                self._save_to_cache(lyrics)
+                _CACHE_POOL.submit(self._save_to_cache, lyrics)
             return lyrics
             
         return None
     
+    def _remember(self, key: Tuple[str, str], lyrics: LyricsData) -> None:
+        """Guarda letras en la caché en memoria, descartando las menos usadas si se llena"""
+        with self._mem_cache_lock:
+            self._mem_cache[key] = lyrics
+            if len(self._mem_cache) > self._mem_cache_max:
+                self._mem_cache.popitem(last=False)
+    
     @abstractmethod
     def _fetch_lyrics(self, title: str, artist: str, album: str = "") -> Optional[LyricsData]:
         """
@@ -136,9 +242,7 @@ class LyricsProvider(ABC):
         """
         Genera una clave única para la caché basada en el título y artista
         """
-        # Normalizar y crear un hash para el nombre del archivo
-        key = f"{artist.lower()}-{title.lower()}"
-        return hashlib.md5(key.encode()).hexdigest()
+        return _cache_key(title, artist)
     
     def _load_from_cache(self, title: str, artist: str) -> Optional[LyricsData]:
         """
@@ -148,10 +252,19 @@ class LyricsProvider(ABC):
             return None
             
         try:
-            cache_file = os.path.join(self.cache_dir, f"{self._generate_cache_key(title, artist)}.json")
-            if os.path.exists(cache_file):
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+            db = _get_cache_db(self.cache_dir)
+            with _CACHE_DB_LOCK:
+                row = db.execute(
+                    "SELECT v FROM lyrics WHERE k = ?", (self._generate_cache_key(title, artist),)
+                ).fetchone()
+            if row:
+                data = orjson.loads(row[0])
+                
+                # Comprobar que la entrada corresponde a la canción pedida y no a una colisión
+                if not _is_cached_song(data, title, artist):
+                    logging.warning(f"La caché de letras no coincide con la canción pedida: {artist} - {title}")
+                    return None
+                
                 return LyricsData.from_dict(data)
         except Exception as e:
             logging.error(f"Error al cargar letras desde caché: {e}")
@@ -166,12 +279,12 @@ class LyricsProvider(ABC):
             return False
             
         try:
-            # Asegurarse de que el directorio exista
-            os.makedirs(self.cache_dir, exist_ok=True)
-            
-            cache_file = os.path.join(self.cache_dir, f"{self._generate_cache_key(lyrics.title, lyrics.artist)}.json")
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(lyrics.to_dict(), f, indent=2)
+            db = _get_cache_db(self.cache_dir)
+            with _CACHE_DB_LOCK:
+                db.execute(
+                    "INSERT OR REPLACE INTO lyrics (k, v) VALUES (?, ?)",
+                    (self._generate_cache_key(lyrics.title, lyrics.artist), orjson.dumps(lyrics.to_dict()))
+                )
             return True
         except Exception as e:
             logging.error(f"Error al guardar letras en caché: {e}")
@@ -2,12 +2,26 @@
 
 import logging
 import re
-import json
 import time
-from typing import Optional, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Tuple
+import orjson
 import requests
+from rapidfuzz import fuzz, utils
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .lyrics_provider import LyricsProvider, LyricsData, LyricLine
 
+# Patrones para normalizar títulos y comparar cadenas
+_PARENS = re.compile(r'\([^)]*\)')
+_BRACKETS = re.compile(r'\[[^\]]*\]')
+_DASH_TAIL = re.compile(r'\s*-\s*.*$')
+_NONWORD = re.compile(r'[^\w\s]')
+
+# Patrones para las letras en formato LRC
+_LRC_TIME = re.compile(r'^[ \t]*\[(\d{1,2}):(\d{1,2})\.(\d{1,3})\]([^\n]*)', re.MULTILINE)
+_LRC_STRIP = re.compile(r'\[\d+:\d+\.\d+\]')
+
 class NeteaseProvider(LyricsProvider):
     """Proveedor de letras usando NetEase Music (China)"""
     
@@ -19,78 +33,64 @@ class NeteaseProvider(LyricsProvider):
         self.lyric_url = f"{self.base_url}/lyric"
         
         # Activar registros detallados
-        self.debug = True
+        self.debug = False
+        self._logger = logging.getLogger("netease")
         
         # Headers comunes para las solicitudes
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
             "Accept": "application/json, text/plain, */*"
         }
+        self.timeout = (3, 5)  # (conexión, lectura) en segundos
+        self.max_candidates = 3  # Canciones candidatas cuyas letras se pueden pedir
+        
+        # Sesión compartida para reutilizar las conexiones entre búsquedas y letras
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self._session.mount("https://", adapter)
+        
+        # Hilos para las búsquedas alternativas y las letras de los candidatos de reserva,
+        # que solo se lanzan a la vez cuando la primera opción falla
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="netease")
     
     def _fetch_lyrics(self, title: str, artist: str, album: str = "") -> Optional[LyricsData]:
         """Obtiene letras de canciones de NetEase Music"""
         try:
             # Buscar la canción
-            self._log_debug(f"Iniciando búsqueda en NetEase para: {artist} - {title}")
-            
-            # Intentar primero con título y artista combinados
-            song_id = self._search_song(title, artist)
-            
-            # Si no se encuentra, intentar solo con el título
-            if not song_id:
-                self._log_debug(f"Intentando búsqueda solo con título: {title}")
-                song_id = self._search_song(title, "")
+            self._logger.debug("Iniciando búsqueda en NetEase para: %s - %s", artist, title)
             
-            # Si aún no hay resultados, intentar con términos alternativos
-            if not song_id:
-                # Para artistas occidentales, pueden estar listados con nombres diferentes
-                alt_title = self._normalize_title(title)
-                self._log_debug(f"Intentando búsqueda con título normalizado: {alt_title}")
-                song_id = self._search_song(alt_title, artist)
+            song_ids = self._search_songs_concurrently(title, artist)
             
-            if not song_id:
+            if not song_ids:
                 logging.info(f"No se encontró canción en NetEase para: {artist} - {title}")
                 return None
             
-            self._log_debug(f"Canción encontrada con ID: {song_id}")
-            
-            # Obtener las letras
-            lyrics_data = self._get_lyrics(song_id)
-            if not lyrics_data:
-                self._log_debug("No se pudieron obtener datos de letras")
-                return None
-            
-            self._log_debug(f"Datos de letras obtenidos: {list(lyrics_data.keys()) if isinstance(lyrics_data, dict) else 'No es diccionario'}")
-            
-            # Extraer el texto de las letras según la estructura de la respuesta
-            lyrics_text = ""
-            if isinstance(lyrics_data, dict):
-                if "lrc" in lyrics_data:
-                    if isinstance(lyrics_data["lrc"], dict) and "lyric" in lyrics_data["lrc"]:
-                        lyrics_text = lyrics_data["lrc"]["lyric"]
-                    elif isinstance(lyrics_data["lrc"], str):
-                        lyrics_text = lyrics_data["lrc"]
-                
-                # Si no hay letras, intentar con tlyric (letras traducidas)
-                if not lyrics_text and "tlyric" in lyrics_data:
-                    if isinstance(lyrics_data["tlyric"], dict) and "lyric" in lyrics_data["tlyric"]:
-                        lyrics_text = lyrics_data["tlyric"]["lyric"]
-                    elif isinstance(lyrics_data["tlyric"], str):
-                        lyrics_text = lyrics_data["tlyric"]
+            self._logger.debug("Canciones candidatas: %s", song_ids[:self.max_candidates])
             
+            # Letras del mejor candidato o, si no tiene, de los siguientes
+            song_id, lyrics_text = self._get_first_lyrics(song_ids[:self.max_candidates])
             if not lyrics_text:
-                self._log_debug(f"No se encontraron letras para song_id: {song_id}")
+                self._logger.debug("No se encontraron letras para ninguno de los candidatos")
                 return None
             
+            self._logger.debug("Letras obtenidas para song_id: %s", song_id)
+            
             # Procesar las letras (pueden estar sincronizadas)
-            has_synced_lyrics = "[" in lyrics_text and "]" in lyrics_text
-            lines = self._parse_lyrics_lines(lyrics_text)
+            cleaned_text, lines = self._parse_and_clean(lyrics_text)
+            
+            # Solo hay letras sincronizadas si el análisis encontró marcas de tiempo LRC
+            has_synced_lyrics = bool(lines) and lines[0].is_synced()
             
             return LyricsData(
                 title=title,
                 artist=artist,
                 album=album,
-                lyrics_text=self._clean_lyrics_text(lyrics_text),
+                lyrics_text=cleaned_text,
                 lines=lines,
                 source="NetEase",
                 has_synced_lyrics=has_synced_lyrics
@@ -98,51 +98,86 @@ class NeteaseProvider(LyricsProvider):
             
         except Exception as e:
             logging.error(f"Error al obtener letras de NetEase: {e}")
-            import traceback
-            self._log_debug(f"Traza de error: {traceback.format_exc()}")
+            if self.debug:
+                self._logger.debug("Traza de error", exc_info=True)
             return None
     
-    def _search_song(self, title: str, artist: str) -> Optional[int]:
-        """Busca una canción en NetEase Music y devuelve su ID"""
+    def _search_songs_concurrently(self, title: str, artist: str) -> List[int]:
+        """
+        Busca con el título y el artista y, solo si no encuentra nada, lanza a la vez las
+        variantes alternativas y devuelve los IDs de la primera, en orden de preferencia,
+        que encuentre alguna canción
+        """
+        # Título y artista combinados: lo habitual es que baste con esta búsqueda
+        song_ids = self._search_songs(title, artist)
+        if song_ids:
+            return song_ids
+        
+        # Para artistas occidentales, pueden estar listados con nombres diferentes
+        search_attempts = [(title, "")]  # Solo el título
+        alt_title = self._normalize_title(title)
+        if alt_title and alt_title != title:
+            search_attempts.append((alt_title, artist))  # Título normalizado
+        
+        futures = [
+            self._executor.submit(self._search_songs, search_title, search_artist)
+            for search_title, search_artist in search_attempts
+        ]
+        try:
+            # Esperar en orden de preferencia; la variante siguiente ya está en curso
+            for future, (search_title, search_artist) in zip(futures, search_attempts):
+                song_ids = future.result()
+                if song_ids:
+                    self._logger.debug("Canciones encontradas con la búsqueda: '%s' / '%s'", search_title, search_artist)
+                    return song_ids
+        finally:
+            # Descartar la variante que ya no hace falta si aún no ha empezado
+            for future in futures:
+                future.cancel()
+        
+        return []
+    
+    def _search_songs(self, title: str, artist: str) -> List[int]:
+        """Busca una canción en NetEase Music y devuelve los IDs de los resultados, del mejor al peor"""
         try:
             # Preparar query
             query = f"{title} {artist}".strip()
                 
-            self._log_debug(f"Búsqueda con query: '{query}'")
+            self._logger.debug("Búsqueda con query: '%s'", query)
             
             # Realizar la solicitud GET
-            url = f"{self.search_url}?keywords={query}&limit=30&type=1"
-            response = requests.get(url, headers=self.headers)
+            params = {"keywords": query, "limit": 30, "type": 1}
+            response = self._session.get(self.search_url, params=params, timeout=self.timeout)
             
-            self._log_debug(f"Respuesta HTTP: {response.status_code}")
+            self._logger.debug("Respuesta HTTP: %s", response.status_code)
             
             if response.status_code != 200:
                 logging.error(f"Error al buscar en NetEase: Status {response.status_code}")
-                return None
+                return []
             
             try:
-                data = response.json()
-            except json.JSONDecodeError:
-                self._log_debug(f"Error al decodificar JSON, respuesta: {response.text[:200]}")
-                return None
+                data = orjson.loads(response.content)
+            except orjson.JSONDecodeError:
+                self._logger.debug("Error al decodificar JSON, respuesta: %.200s", response.text)
+                return []
                 
-            self._log_debug(f"Claves en respuesta JSON: {list(data.keys()) if data else None}")
+            self._logger.debug("Claves en respuesta JSON: %s", data.keys() if data else None)
             
             # Verificar si hay resultados
             if not data or "result" not in data or not data["result"] or "songs" not in data["result"]:
-                self._log_debug(f"Respuesta completa: {data}")
+                self._logger.debug("Respuesta completa: %s", data)
                 logging.warning("No se encontraron resultados en NetEase")
-                return None
+                return []
             
             songs = data["result"]["songs"]
             song_count = len(songs)
-            self._log_debug(f"Encontradas {song_count} canciones")
+            self._logger.debug("Encontradas %d canciones", song_count)
             
             if not song_count:
-                return None
+                return []
                 
             # Registrar las primeras 3 canciones para depuración
-            if self.debug and song_count > 0:
+            if self._logger.isEnabledFor(logging.DEBUG):
                 for i, song in enumerate(songs[:min(3, song_count)]):
                     name = song.get("name", "")
                     
@@ -154,15 +189,19 @@ class NeteaseProvider(LyricsProvider):
                         artists = [a.get("name", "") for a in song["ar"]]
                     
                     song_id = song.get("id")
-                    self._log_debug(f"Canción {i+1}: ID={song_id}, Nombre='{name}', Artistas={artists}")
+                    self._logger.debug("Canción %d: ID=%s, Nombre='%s', Artistas=%s", i + 1, song_id, name, artists)
+            
+            song_ids = [song.get("id") for song in songs]
             
-            # Si no hay artista, devolver la primera coincidencia
+            # Si no hay artista, conservar el orden de NetEase
             if not artist.strip():
-                return songs[0].get("id")
+                return [song_id for song_id in song_ids if song_id]
             
-            # Intentar encontrar la mejor coincidencia
-            best_match = None
-            highest_score = 0
+            # Puntuar cada resultado para encontrar las mejores coincidencias
+            scores = []
+            title_lc = title.lower()
+            artist_lc = artist.lower()
+            norm_title = self._normalize_title(title_lc)
             
             for song in songs:
                 song_name = song.get("name", "").lower()
@@ -183,120 +222,90 @@ class NeteaseProvider(LyricsProvider):
                 
                 # Normalizar título para comparación
                 norm_song_name = self._normalize_title(song_name)
-                norm_title = self._normalize_title(title.lower())
                 
-                # Calcular puntuación de coincidencia
+                # Calcular puntuación de coincidencia (la coincidencia tras normalizar pesa algo
+                # menos, para que el título exacto gane a sus versiones remix/live)
                 title_score = max([
-                    self._similarity_score(song_name, title.lower()),
-                    self._similarity_score(norm_song_name, norm_title)
+                    self._similarity_score(song_name, title_lc),
+                    self._similarity_score(norm_song_name, norm_title) * 0.95
                 ])
                 
                 # Comprobar si hay coincidencia en alias
                 for alias in song_aliases:
-                    alias_score = self._similarity_score(alias, title.lower())
+                    alias_score = self._similarity_score(alias, title_lc)
                     if alias_score > title_score:
                         title_score = alias_score
                 
-                # Verificar artista
+                # Verificar artista (aquí siempre hay artista: sin él se devuelve antes el orden de NetEase)
                 artist_score = 0
-                if artist.strip():
-                    artist_scores = [self._similarity_score(song_artist, artist.lower()) for song_artist in song_artists]
-                    if artist_scores:
-                        artist_score = max(artist_scores)
+                artist_scores = [self._similarity_score(song_artist, artist_lc) for song_artist in song_artists]
+                if artist_scores:
+                    artist_score = max(artist_scores)
                 
                 # Puntaje combinado (mayor peso al título)
-                if artist.strip():
-                    combined_score = title_score * 0.7 + artist_score * 0.3
-                else:
-                    combined_score = title_score
+                combined_score = title_score * 0.7 + artist_score * 0.3
                 
-                self._log_debug(f"Canción: '{song_name}' por {song_artists} - Puntuación: {combined_score:.2f} (Título: {title_score:.2f}, Artista: {artist_score:.2f})")
+                self._logger.debug("Canción: '%s' por %s - Puntuación: %.2f (Título: %.2f, Artista: %.2f)",
+                                   song_name, song_artists, combined_score, title_score, artist_score)
                 
-                if combined_score > highest_score:
-                    highest_score = combined_score
-                    best_match = song
-            
-            # Si encontramos una coincidencia razonable
-            if best_match and highest_score > 0.3:  # Umbral más bajo para encontrar más coincidencias
-                self._log_debug(f"Mejor coincidencia: {best_match.get('name')} (ID: {best_match.get('id')}) con puntuación {highest_score:.2f}")
-                return best_match.get("id")
-            
-            # Si no hay coincidencia razonable, devolver el primer resultado
-            if songs:
-                self._log_debug(f"Sin coincidencia con umbral, usando primera canción: {songs[0].get('name')} (ID: {songs[0].get('id')})")
-                return songs[0].get("id")
+                scores.append(combined_score)
+            
+            # Si hay una coincidencia razonable, ordenar por puntuación (los empates conservan el orden de NetEase)
+            if max(scores) > 0.55:  # Dos cadenas sin relación ya rondan 0.3-0.45 con token_sort_ratio
+                ranked = sorted(range(song_count), key=lambda i: -scores[i])
+                best = songs[ranked[0]]
+                self._logger.debug("Mejor coincidencia: %s (ID: %s) con puntuación %.2f", best.get("name"), best.get("id"), scores[ranked[0]])
+                song_ids = [song_ids[i] for i in ranked]
+            else:
+                # Si no hay coincidencia razonable, conservar el orden de NetEase
+                self._logger.debug("Sin coincidencia con umbral, usando primera canción: %s (ID: %s)", songs[0].get("name"), songs[0].get("id"))
             
-            return None
+            return [song_id for song_id in song_ids if song_id]
             
         except Exception as e:
             logging.error(f"Error al buscar canción en NetEase: {e}")
-            import traceback
-            self._log_debug(f"Traza de error en búsqueda: {traceback.format_exc()}")
-            return None
+            if self.debug:
+                self._logger.debug("Traza de error en búsqueda", exc_info=True)
+            return []
     
     def _normalize_title(self, title: str) -> str:
         """Normaliza el título de la canción para mejorar coincidencias"""
         # Eliminar paréntesis y su contenido (versiones, remixes, etc.)
-        normalized = re.sub(r'\([^)]*\)', '', title)
+        normalized = _PARENS.sub('', title)
         # Eliminar corchetes y su contenido
-        normalized = re.sub(r'\[[^\]]*\]', '', normalized)
+        normalized = _BRACKETS.sub('', normalized)
         # Eliminar - y lo que sigue (típicamente remix, version, etc.)
-        normalized = re.sub(r'\s*-\s*.*$', '', normalized)
+        normalized = _DASH_TAIL.sub('', normalized)
         # Eliminar caracteres especiales
-        normalized = re.sub(r'[^\w\s]', '', normalized)
+        normalized = _NONWORD.sub('', normalized)
         # Normalizar espacios
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
+        normalized = ' '.join(normalized.split())
         
         return normalized
     
     def _similarity_score(self, str1: str, str2: str) -> float:
-        """Calcula un puntaje de similitud entre dos cadenas"""
-        # Eliminar caracteres especiales y normalizar espacios
-        str1 = re.sub(r'[^\w\s]', '', str1).strip()
-        str2 = re.sub(r'[^\w\s]', '', str2).strip()
-        
-        if not str1 or not str2:
-            return 0.0
-        
-        # Si son iguales
-        if str1 == str2:
-            return 1.0
-        
-        # Si uno está contenido en el otro
-        if str1 in str2:
-            return 0.9
-        if str2 in str1:
-            return 0.9
-        
-        # Comparación de palabras comunes
-        words1 = set(str1.split())
-        words2 = set(str2.split())
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        common_words = words1.intersection(words2)
-        
-        return len(common_words) / max(len(words1), len(words2))
+        """Calcula un puntaje de similitud entre dos cadenas (0.0 a 1.0)"""
+        # default_process normaliza mayúsculas, caracteres especiales y espacios; token_sort_ratio
+        # (a diferencia de token_set_ratio) penaliza las palabras de más, así que un subconjunto no puntúa 1.0
+        return fuzz.token_sort_ratio(str1, str2, processor=utils.default_process) / 100.0
     
     def _get_lyrics(self, song_id: int) -> Optional[Dict[str, Any]]:
         """Obtiene las letras de una canción de NetEase por su ID"""
         try:
-            self._log_debug(f"Obteniendo letras para song_id: {song_id}")
-            url = f"{self.lyric_url}?id={song_id}"
-            response = requests.get(url, headers=self.headers)
+            self._logger.debug("Obteniendo letras para song_id: %s", song_id)
+            response = self._session.get(self.lyric_url, params={"id": song_id}, timeout=self.timeout)
             
             if response.status_code != 200:
                 logging.error(f"Error al obtener letras de NetEase: Status {response.status_code}")
                 return None
             
             try:
-                data = response.json()
-            except json.JSONDecodeError:
-                self._log_debug(f"Error al decodificar JSON de letras, respuesta: {response.text[:200]}")
+                data = orjson.loads(response.content)
+            except orjson.JSONDecodeError:
+                self._logger.debug("Error al decodificar JSON de letras, respuesta: %.200s", response.text)
                 return None
                 
-            self._log_debug(f"Respuesta de letras obtenida con claves: {list(data.keys()) if data else None}")
+            self._logger.debug("Respuesta de letras obtenida con claves: %s", data.keys() if data else None)
             
             return data
             
@@ -304,52 +313,80 @@ class NeteaseProvider(LyricsProvider):
             logging.error(f"Error al obtener letras de NetEase: {e}")
             return None
     
-    def _parse_lyrics_lines(self, lyrics_text: str) -> List[LyricLine]:
-        """Divide el texto de las letras en líneas, procesando las marcas de tiempo si existen"""
-        if not lyrics_text:
-            return []
+    def _get_first_lyrics(self, song_ids: List[int]) -> Tuple[Optional[int], str]:
+        """
+        Descarga las letras del mejor candidato y, solo si no tiene, las de los siguientes
+        en paralelo; devuelve las del primero, en orden de preferencia, que tenga letras
+        """
+        lyrics_text = self._extract_lyrics_text(self._get_lyrics(song_ids[0]))
+        if lyrics_text or len(song_ids) == 1:
+            return song_ids[0], lyrics_text
         
-        lines = []
-        time_pattern = re.compile(r'\[(\d+):(\d+)\.(\d+)\](.*)')
-        
-        for line_text in lyrics_text.split('\n'):
-            # Ignorar líneas vacías
-            if not line_text.strip():
-                continue
-            
-            # Comprobar si hay marcas de tiempo
-            match = time_pattern.match(line_text)
-            if match:
-                minutes, seconds, milliseconds, text = match.groups()
-                start_time_ms = (int(minutes) * 60 * 1000) + (int(seconds) * 1000) + int(milliseconds)
-                line = LyricLine(text=text.strip(), start_time_ms=start_time_ms, end_time_ms=start_time_ms + 5000)
-            else:
-                # Sin marcas de tiempo
-                line = LyricLine(text=line_text.strip())
-            
-            lines.append(line)
+        fallback_ids = song_ids[1:]
+        futures = [self._executor.submit(self._get_lyrics, song_id) for song_id in fallback_ids]
+        try:
+            for song_id, future in zip(fallback_ids, futures):
+                lyrics_text = self._extract_lyrics_text(future.result())
+                if lyrics_text:
+                    return song_id, lyrics_text
+        finally:
+            for future in futures:
+                future.cancel()
         
-        # Ajustar los tiempos de finalización basados en la línea siguiente
-        for i in range(len(lines) - 1):
-            if lines[i].is_synced() and lines[i+1].is_synced():
-                lines[i].end_time_ms = lines[i+1].start_time_ms
+        return None, ""
+    
+    def _extract_lyrics_text(self, lyrics_data: Optional[Dict[str, Any]]) -> str:
+        """Extrae el texto de las letras según la estructura de la respuesta"""
+        lyrics_text = ""
+        if isinstance(lyrics_data, dict):
+            if "lrc" in lyrics_data:
+                if isinstance(lyrics_data["lrc"], dict) and "lyric" in lyrics_data["lrc"]:
+                    lyrics_text = lyrics_data["lrc"]["lyric"]
+                elif isinstance(lyrics_data["lrc"], str):
+                    lyrics_text = lyrics_data["lrc"]
+            
+            # Si no hay letras, intentar con tlyric (letras traducidas)
+            if not lyrics_text and "tlyric" in lyrics_data:
+                if isinstance(lyrics_data["tlyric"], dict) and "lyric" in lyrics_data["tlyric"]:
+                    lyrics_text = lyrics_data["tlyric"]["lyric"]
+                elif isinstance(lyrics_data["tlyric"], str):
+                    lyrics_text = lyrics_data["tlyric"]
         
-        return lines
+        return lyrics_text or ""
     
-    def _clean_lyrics_text(self, lyrics_text: str) -> str:
-        """Limpia el texto de las letras eliminando las marcas de tiempo"""
+    def _parse_and_clean(self, lyrics_text: str) -> Tuple[str, List[LyricLine]]:
+        """
+        Divide las letras en líneas procesando las marcas de tiempo si existen y, en el mismo
+        recorrido, genera el texto limpio sin marcas ni líneas vacías
+        """
         if not lyrics_text:
-            return ""
+            return "", []
         
-        # Eliminar marcas de tiempo
-        cleaned_text = re.sub(r'\[\d+:\d+\.\d+\]', '', lyrics_text)
+        # Un único recorrido del documento completo en busca de marcas de tiempo
+        matches = _LRC_TIME.findall(lyrics_text)
+        if not matches:
+            # Sin marcas de tiempo
+            texts = [line_text.strip() for line_text in lyrics_text.splitlines() if line_text.strip()]
+            return '\n'.join(texts), [LyricLine(text=text) for text in texts]
         
-        # Eliminar líneas vacías
-        lines = [line.strip() for line in cleaned_text.split('\n') if line.strip()]
+        starts = []
+        texts = []
+        for minutes, seconds, fraction, text in matches:
+            # Las fracciones pueden venir en décimas, centésimas o milésimas
+            starts.append(int(minutes) * 60000 + int(seconds) * 1000 + int(fraction.ljust(3, '0')))
+            
+            # Quitar marcas de tiempo adicionales en la misma línea
+            text = text.strip()
+            if '[' in text:
+                text = _LRC_STRIP.sub('', text).strip()
+            texts.append(text)
         
-        return '\n'.join(lines)
-    
-    def _log_debug(self, message: str) -> None:
-        """Registra mensajes de depuración si el modo debug está activado"""
-        if self.debug:
-            logging.debug(f"[NetEase] {message}")
\ No newline at end of file
+        # Cada línea termina donde empieza la siguiente; la última dura 5 segundos
+        ends = starts[1:]
+        ends.append(starts[-1] + 5000)
+        
+        lines = [
+            LyricLine(text=text, start_time_ms=start, end_time_ms=end)
+            for text, start, end in zip(texts, starts, ends)
+        ]
+        return '\n'.join(text for text in texts if text), lines
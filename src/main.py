@@ -6,18 +6,10 @@ import logging
 from pathlib import Path
 import traceback
 from PyQt6.QtWidgets import QApplication, QMessageBox
-import dotenv
 
 from .config import Config
 from .player_detection.detector import MusicDetectionManager
-from .player_detection.spotify_detector import SpotifyDetector
-from .player_detection.windows_media_detector import WindowsMediaDetector
-from .player_detection.browser_detector import BrowserDetector
-from .lyrics.lyrics_provider import LyricsData
 from .lyrics.lyrics_manager import LyricsManager
-from .lyrics.genius_provider import GeniusProvider
-from .lyrics.lrclib_provider import LRCLibProvider
-from .lyrics.netease_provider import NeteaseProvider
 from .ui.main_window import MainWindow
 from .ui.widget_mode import WidgetMode
 from .ui.styles import Styles
@@ -52,8 +44,12 @@ def main():
     # Configurar manejo de excepciones
     sys.excepthook = exception_hook
     
-    # Cargar variables de entorno
-    dotenv.load_dotenv()
+    # Cargar variables de entorno (python-dotenv es opcional)
+    try:
+        import dotenv
+        dotenv.load_dotenv()
+    except ImportError:
+        pass
     
     # Crear la aplicación
     app = QApplication(sys.argv)
@@ -72,6 +68,7 @@ def main():
         spotify_client_secret = config.get("players", "spotify", {}).get("client_secret", "") or os.getenv("SPOTIFY_CLIENT_SECRET", "")
         
         if spotify_client_id and spotify_client_secret:
+            from .player_detection.spotify_detector import SpotifyDetector
             spotify_detector = SpotifyDetector(
                 client_id=spotify_client_id,
                 client_secret=spotify_client_secret
@@ -83,21 +80,27 @@ def main():
     
     # Configurar detector de Windows Media
     if config.get("players", "windows_media", {}).get("enabled", True):
+        from .player_detection.windows_media_detector import WindowsMediaDetector
         windows_media_detector = WindowsMediaDetector()
         music_manager.register_detector(windows_media_detector)
         logging.info("Detector de Windows Media configurado")
     
     # Configurar detector de navegadores
     if config.get("players", "browsers", {}).get("enabled", True):
+        from .player_detection.browser_detector import BrowserDetector
         browser_detector = BrowserDetector()
         music_manager.register_detector(browser_detector)
         logging.info("Detector de navegadores configurado")
     
-    # Inicializar detectores
+    # Inicializar detectores (y detener sus hilos al salir)
     music_manager.initialize_detectors()
+    app.aboutToQuit.connect(music_manager.stop)
     
-    # Configurar gestor de letras
-    lyrics_manager = LyricsManager()
+    # Configurar gestor de letras (con caché en disco si está habilitada; la misma base de datos
+    # que usan los proveedores)
+    lyrics_cache_dir = str(config.lyrics_cache_dir) if config.get("lyrics", "cache_lyrics", True) else None
+    lyrics_manager = LyricsManager(cache_dir=lyrics_cache_dir)
+    app.aboutToQuit.connect(lyrics_manager.stop)
     
     # Registrar proveedores de letras según la configuración y el nuevo orden de prioridades:
     # 1. LRCLIB
@@ -106,6 +109,7 @@ def main():
     
     # 1. LRCLIB (prioridad más alta = 0)
     if config.get("lyrics", "providers", {}).get("lrclib", {}).get("enabled", True):
+        from .lyrics.lrclib_provider import LRCLibProvider
         lrclib_provider = LRCLibProvider(cache_dir=str(config.lyrics_cache_dir))
         # Prioridad 0 (máxima prioridad)
         lyrics_manager.register_provider(lrclib_provider, priority=0)
@@ -113,6 +117,7 @@ def main():
     
     # 2. NetEase (prioridad = 1)
     if config.get("lyrics", "providers", {}).get("netease", {}).get("enabled", True):
+        from .lyrics.netease_provider import NeteaseProvider
         netease_provider = NeteaseProvider(cache_dir=str(config.lyrics_cache_dir))
         lyrics_manager.register_provider(netease_provider, priority=1)
         logging.info("Proveedor de letras NetEase configurado con prioridad 1")
@@ -124,6 +129,7 @@ def main():
             os.getenv("GENIUS_API_KEY", "")
         )
         if genius_api_key:
+            from .lyrics.genius_provider import GeniusProvider
             genius_provider = GeniusProvider(
                 api_key=genius_api_key,
                 cache_dir=str(config.lyrics_cache_dir)
@@ -1,17 +1,58 @@
 import logging
-from typing import Optional
+import re
+import time
+import ctypes
+import threading
+from ctypes import wintypes
+from typing import Dict, Optional
+import pywintypes
 import win32gui
 import win32process
-import psutil
 
-from .detector import PlayerDetector, MusicInfo, PlayerControls
+from .detector import PlayerDetector, MusicInfo, PlayerControls, ProcessSnapshot
+
+# Fragmentos de título que indican un reproductor web, en una sola pasada
+# (" - YouTube Music" va antes que " - YouTube" para que gane la coincidencia más larga)
+_PLAYER_TITLE = re.compile(r' - YouTube Music| - YouTube| \| Spotify')
+
+# Constantes de SetWinEventHook
+EVENT_OBJECT_CREATE = 0x8000
+EVENT_OBJECT_HIDE = 0x8003
+EVENT_OBJECT_NAMECHANGE = 0x800C
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+GA_ROOT = 2
+WM_QUIT = 0x0012
+
+_WinEventProc = ctypes.WINFUNCTYPE(
+    None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+    wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+)
+
+# Instancia propia de user32 para no alterar los prototipos globales de ctypes.windll
+_user32 = ctypes.WinDLL("user32")
+_user32.SetWinEventHook.restype = wintypes.HANDLE
+_user32.SetWinEventHook.argtypes = [
+    wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, _WinEventProc,
+    wintypes.DWORD, wintypes.DWORD, wintypes.DWORD
+]
+_user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+_user32.GetAncestor.restype = wintypes.HWND
+_user32.GetAncestor.argtypes = [wintypes.HWND, wintypes.UINT]
+_user32.PostThreadMessageW.argtypes = [wintypes.DWORD, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+
+def _is_player_title(title: str) -> bool:
+    """Verifica si el título de una ventana indica reproducción de música"""
+    return _PLAYER_TITLE.search(title) is not None
 
 class BrowserDetector(PlayerDetector):
     """Detector para reproductores web en navegadores"""
     
     def __init__(self):
         super().__init__("Browser")
-        self.browser_processes = ["chrome.exe", "msedge.exe", "firefox.exe", "opera.exe", "brave.exe"]
+        self.browser_processes = frozenset(("chrome.exe", "msedge.exe", "firefox.exe", "opera.exe", "brave.exe"))
         self.controls = PlayerControls(
             can_play=False,
             can_pause=False,
@@ -21,15 +62,49 @@ class BrowserDetector(PlayerDetector):
             can_shuffle=False,
             can_repeat=False
         )
+        
+        # Caché {pid: nombre del proceso en minúsculas}, renovada como mucho cada pocos segundos
+        self._pid_name_cache: Dict[int, str] = {}
+        self._pid_cache_ts = 0.0
+        self._pid_cache_ttl = 2.0
+        
+        # Ventanas de reproductores web {hwnd: título}, mantenidas por un hook de eventos de Windows
+        self._windows: Dict[int, str] = {}
+        self._hook_thread: Optional[threading.Thread] = None
+        self._hook_thread_id = 0  # Identificador de Win32 del hilo, para enviarle WM_QUIT
+        self._hook_ready = threading.Event()
+        self._hook_active = False
+        self._win_event_proc = _WinEventProc(self._on_win_event)
+        
+        # Analizador de título para cada fragmento de _PLAYER_TITLE
+        self._title_parsers = {
+            " - YouTube": self._parse_youtube,
+            " | Spotify": self._parse_spotify_web,
+            " - YouTube Music": self._parse_youtube_music
+        }
+    
+    def _refresh_pid_cache(self, snapshot: Optional[ProcessSnapshot] = None) -> None:
+        """Renueva la caché de nombres con la instantánea del ciclo o, sin ella, con una nueva"""
+        self._pid_name_cache = (snapshot or ProcessSnapshot()).names
+        self._pid_cache_ts = time.monotonic()
+    
+    def _get_process_name(self, pid: int, snapshot: Optional[ProcessSnapshot] = None) -> Optional[str]:
+        """Devuelve el nombre en minúsculas del proceso, renovando la caché si hace falta"""
+        name = self._pid_name_cache.get(pid)
+        if name is None and time.monotonic() - self._pid_cache_ts > self._pid_cache_ttl:
+            self._refresh_pid_cache(snapshot)
+            name = self._pid_name_cache.get(pid)
+        return name
     
     def initialize(self) -> bool:
         """Inicializa el detector de navegadores"""
         try:
             # No hay mucho que inicializar, solo verificamos si hay navegadores ejecutándose
-            for proc in psutil.process_iter(['name']):
-                if proc.info['name'] and proc.info['name'].lower() in self.browser_processes:
-                    self.is_available = True
-                    return True
+            self._refresh_pid_cache()
+            if not self.browser_processes.isdisjoint(self._pid_name_cache.values()):
+                self.is_available = True
+                self._start_window_hook()
+                return True
             
             return False
         except Exception as e:
@@ -37,75 +112,118 @@ class BrowserDetector(PlayerDetector):
             self.is_available = False
             return False
     
-    def get_current_track(self) -> Optional[MusicInfo]:
+    def _start_window_hook(self) -> None:
+        """Arranca el hilo que escucha los cambios de ventanas en lugar de recorrerlas en cada sondeo"""
+        if self._hook_thread:
+            return
+        
+        # Estado inicial: un único recorrido de todas las ventanas
+        win32gui.EnumWindows(self._track_window, None)
+        
+        self._hook_thread = threading.Thread(target=self._hook_loop, name="browser-window-hook", daemon=True)
+        self._hook_thread.start()
+        self._hook_ready.wait(2.0)
+        
+        if not self._hook_active:
+            logging.warning("No se pudo instalar el hook de ventanas; se recorrerán las ventanas en cada sondeo")
+    
+    def _hook_loop(self) -> None:
+        """Instala los hooks de eventos de ventana y atiende sus mensajes hasta recibir WM_QUIT"""
+        user32 = _user32
+        self._hook_thread_id = threading.get_native_id()
+        flags = WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS
+        hooks = [
+            # Creación, destrucción y cambios de visibilidad
+            user32.SetWinEventHook(EVENT_OBJECT_CREATE, EVENT_OBJECT_HIDE, None, self._win_event_proc, 0, 0, flags),
+            # Cambios de título
+            user32.SetWinEventHook(EVENT_OBJECT_NAMECHANGE, EVENT_OBJECT_NAMECHANGE, None, self._win_event_proc, 0, 0, flags)
+        ]
+        
+        self._hook_active = all(hooks)
+        self._hook_ready.set()
+        
+        if self._hook_active:
+            msg = wintypes.MSG()
+            while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        
+        self._hook_active = False
+        self._hook_thread_id = 0
+        for hook in hooks:
+            if hook:
+                user32.UnhookWinEvent(hook)
+    
+    def stop(self) -> None:
+        """Detiene el hilo del hook de ventanas, que quita sus hooks al salir del bucle de mensajes"""
+        self.is_available = False
+        if self._hook_thread_id:
+            _user32.PostThreadMessageW(self._hook_thread_id, WM_QUIT, 0, 0)
+        if self._hook_thread:
+            self._hook_thread.join(1.0)
+    
+    def _on_win_event(self, hook, event, hwnd, id_object, id_child, thread_id, timestamp) -> None:
+        """Callback de SetWinEventHook: actualiza la ventana afectada"""
+        if id_object != OBJID_WINDOW or id_child != CHILDID_SELF or not hwnd:
+            return
+        
+        # Solo interesan las ventanas de nivel superior; las ya guardadas se comprueban siempre
+        # porque una ventana destruida ya no tiene ancestro
+        if hwnd not in self._windows and _user32.GetAncestor(hwnd, GA_ROOT) != hwnd:
+            return
+        
+        try:
+            self._track_window(hwnd, None)
+        except Exception:
+            # La ventana puede haberse destruido mientras se procesaba el evento
+            self._windows.pop(hwnd, None)
+    
+    def _track_window(self, hwnd, _) -> bool:
+        """Guarda la ventana si es visible y su título indica un reproductor, o la descarta"""
+        if win32gui.IsWindow(hwnd) and win32gui.IsWindowVisible(hwnd):
+            title = win32gui.GetWindowText(hwnd)
+            if title and _is_player_title(title):
+                self._windows[hwnd] = title
+                return True
+        
+        self._windows.pop(hwnd, None)
+        return True
+    
+    def get_current_track(self, snapshot: Optional[ProcessSnapshot] = None) -> Optional[MusicInfo]:
         """Obtiene información sobre la pista actual de navegadores"""
         if not self.is_available:
             return None
         
         try:
-            # Buscar ventanas de navegadores que contengan títulos de reproductores
-            windows_info = []
+            # Ventanas con títulos de reproductores: las que mantiene el hook o, sin él, un recorrido completo
+            if not self._hook_active:
+                self._windows.clear()
+                win32gui.EnumWindows(self._track_window, None)
             
-            def enum_window_callback(hwnd, windows_info):
-                if not win32gui.IsWindowVisible(hwnd):
-                    return True
-                
-                title = win32gui.GetWindowText(hwnd)
-                if not title:
-                    return True
+            # Quedarse solo con las que pertenecen a un navegador
+            windows_info = []
+            for hwnd, title in self._windows.copy().items():
+                try:
+                    _, pid = win32process.GetWindowThreadProcessId(hwnd)
+                except pywintypes.error:
+                    # La ventana se cerró desde que se registró
+                    continue
                 
-                # Verificar si el título indica reproducción de música
-                if any(pattern in title for pattern in [" - YouTube", "| Spotify", "| YouTube Music"]):
-                    try:
-                        _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                        proc = psutil.Process(pid)
-                        if proc.name().lower() in self.browser_processes:
-                            windows_info.append((hwnd, title, proc.name()))
-                    except:
-                        pass
-                return True
-            
-            win32gui.EnumWindows(enum_window_callback, windows_info)
+                # El nombre sale de la caché de procesos: una consulta a un diccionario que no falla
+                process_name = self._get_process_name(pid, snapshot)
+                if process_name in self.browser_processes:
+                    windows_info.append((hwnd, title, process_name))
             
             # Procesar las ventanas encontradas
             for hwnd, title, process_name in windows_info:
-                # YouTube
-                if " - YouTube" in title:
-                    track_title = title.replace(" - YouTube", "").strip()
-                    if len(track_title) > 3:  # Ignorar títulos muy cortos
-                        return MusicInfo(
-                            title=track_title,
-                            artist="YouTube",
-                            album="",
-                            player_name="YouTube",
-                            is_playing=True
-                        )
+                match = _PLAYER_TITLE.search(title)
+                if not match:
+                    continue
                 
-                # Spotify Web
-                elif " | Spotify" in title:
-                    track_info = title.replace(" | Spotify", "").strip()
-                    if " - " in track_info:
-                        artist, track_title = track_info.split(" - ", 1)
-                        return MusicInfo(
-                            title=track_title,
-                            artist=artist,
-                            album="",
-                            player_name="Spotify Web",
-                            is_playing=True
-                        )
-                
-                # YouTube Music
-                elif " - YouTube Music" in title:
-                    track_info = title.replace(" - YouTube Music", "").strip()
-                    if " - " in track_info:
-                        artist, track_title = track_info.split(" - ", 1)
-                        return MusicInfo(
-                            title=track_title,
-                            artist=artist,
-                            album="",
-                            player_name="YouTube Music",
-                            is_playing=True
-                        )
+                # El texto de la pista es lo que precede al fragmento (se descarta, p. ej., " - Google Chrome")
+                track = self._title_parsers[match.group()](title[:match.start()].strip())
+                if track:
+                    return track
             
             return None
             
@@ -113,30 +231,43 @@ class BrowserDetector(PlayerDetector):
             logging.error(f"Error al obtener pista actual de navegador: {e}")
             return None
     
-    def play(self) -> bool:
-        """No implementado para navegadores"""
-        return False
-    
-    def pause(self) -> bool:
-        """No implementado para navegadores"""
-        return False
-    
-    def next_track(self) -> bool:
-        """No implementado para navegadores"""
-        return False
-    
-    def previous_track(self) -> bool:
-        """No implementado para navegadores"""
-        return False
-    
-    def seek(self, position_ms: int) -> bool:
-        """No implementado para navegadores"""
-        return False
+    def _parse_youtube(self, track_title: str) -> Optional[MusicInfo]:
+        """Crea la pista a partir del título de una ventana de YouTube"""
+        if len(track_title) <= 3:  # Ignorar títulos muy cortos
+            return None
+        
+        return MusicInfo(
+            title=track_title,
+            artist="YouTube",
+            album="",
+            player_name="YouTube",
+            is_playing=True
+        )
     
-    def set_shuffle(self, state: bool) -> bool:
-        """No implementado para navegadores"""
-        return False
+    def _parse_spotify_web(self, track_info: str) -> Optional[MusicInfo]:
+        """Crea la pista a partir del título de una ventana de Spotify Web"""
+        if " - " not in track_info:
+            return None
+        
+        artist, track_title = track_info.split(" - ", 1)
+        return MusicInfo(
+            title=track_title,
+            artist=artist,
+            album="",
+            player_name="Spotify Web",
+            is_playing=True
+        )
     
-    def set_repeat(self, state: bool) -> bool:
-        """No implementado para navegadores"""
-        return False
+    def _parse_youtube_music(self, track_info: str) -> Optional[MusicInfo]:
+        """Crea la pista a partir del título de una ventana de YouTube Music"""
+        if " - " not in track_info:
+            return None
+        
+        artist, track_title = track_info.split(" - ", 1)
+        return MusicInfo(
+            title=track_title,
+            artist=artist,
+            album="",
+            player_name="YouTube Music",
+            is_playing=True
+        )
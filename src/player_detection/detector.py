@@ -1,12 +1,39 @@
 # src/player_detection/detector.py
 
 import logging
+import time
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Dict, Optional, List, Any
 import hashlib
+import psutil
+
+def _short_hash(data: bytes) -> str:
+    """Hash no criptográfico de 12 caracteres hexadecimales"""
+    return hashlib.blake2b(data, digest_size=6).hexdigest()
+
+@lru_cache(maxsize=512)
+def _compute_track_id(normalized_artist: str, normalized_title: str, player_name: str) -> str:
+    """Calcula el ID estable de una pista a partir de sus datos normalizados"""
+    # Si tenemos título y artista, usar la combinación para crear un ID estable
+    if normalized_title and normalized_artist:
+        stable_id = f"{normalized_artist}:{normalized_title}"
+        # Crear un hash consistente para evitar caracteres especiales
+        return f"track_{_short_hash(stable_id.encode())}"
+        
+    # Si falta información, usar lo que tenemos
+    elif normalized_title:
+        return f"title_{_short_hash(normalized_title.encode())}"
+    elif normalized_artist:
+        return f"artist_{_short_hash(normalized_artist.encode())}"
+    else:
+        # Último recurso - generar un ID aleatorio basado en el nombre del reproductor
+        return f"unknown_{_short_hash(player_name.encode() if player_name else b'unknown')}"
 
 class MusicInfo:
     """Información sobre una canción reproducida"""
+    __slots__ = ("title", "artist", "album", "album_art_url", "duration_ms",
+                 "position_ms", "is_playing", "player_name", "track_id")
     
     def __init__(self, 
                  title: str = "", 
@@ -48,24 +75,8 @@ class MusicInfo:
         normalized_artist = self.artist.lower().strip() if self.artist else ""
         normalized_title = self.title.lower().strip() if self.title else ""
         
-        # Si tenemos título y artista, usar la combinación para crear un ID estable
-        if normalized_title and normalized_artist:
-            stable_id = f"{normalized_artist}:{normalized_title}"
-            # Crear un hash consistente para evitar caracteres especiales
-            hash_object = hashlib.md5(stable_id.encode())
-            return f"track_{hash_object.hexdigest()[:12]}"
-            
-        # Si falta información, usar lo que tenemos
-        elif normalized_title:
-            hash_object = hashlib.md5(normalized_title.encode())
-            return f"title_{hash_object.hexdigest()[:12]}"
-        elif normalized_artist:
-            hash_object = hashlib.md5(normalized_artist.encode())
-            return f"artist_{hash_object.hexdigest()[:12]}"
-        else:
-            # Último recurso - generar un ID aleatorio basado en el nombre del reproductor
-            player_hash = hashlib.md5(self.player_name.encode()) if self.player_name else hashlib.md5(b"unknown")
-            return f"unknown_{player_hash.hexdigest()[:12]}"
+        # Las pistas repetidas (un sondeo por segundo) reutilizan el ID ya calculado
+        return _compute_track_id(normalized_artist, normalized_title, self.player_name or "")
     
     def is_valid(self) -> bool:
         """Verifica si la información de la pista es válida"""
@@ -109,8 +120,31 @@ class MusicInfo:
         """Verdadero si hay información mínima de pista (título o artista)"""
         return bool(self.title or self.artist)
 
+def _flag_property(flag: int, doc: str) -> property:
+    """Expone un bit de PlayerControls.flags como atributo booleano"""
+    def getter(self) -> bool:
+        return bool(self.flags & flag)
+    
+    def setter(self, value: bool) -> None:
+        if value:
+            self.flags |= flag
+        else:
+            self.flags &= ~flag
+    
+    return property(getter, setter, doc=doc)
+
 class PlayerControls:
-    """Controles para el reproductor de música"""
+    """Controles para el reproductor de música (guardados como máscara de bits en flags)"""
+    __slots__ = ("flags",)
+    
+    CAN_PLAY = 1 << 0
+    CAN_PAUSE = 1 << 1
+    CAN_NEXT = 1 << 2
+    CAN_PREVIOUS = 1 << 3
+    CAN_SEEK = 1 << 4
+    CAN_SHUFFLE = 1 << 5
+    CAN_REPEAT = 1 << 6
+    
     def __init__(self, 
                  can_play: bool = False, 
                  can_pause: bool = False,
@@ -119,13 +153,49 @@ class PlayerControls:
                  can_seek: bool = False,
                  can_shuffle: bool = False,
                  can_repeat: bool = False):
-        self.can_play = can_play
-        self.can_pause = can_pause
-        self.can_next = can_next
-        self.can_previous = can_previous
-        self.can_seek = can_seek
-        self.can_shuffle = can_shuffle
-        self.can_repeat = can_repeat
+        self.flags = (
+            (self.CAN_PLAY if can_play else 0)
+            | (self.CAN_PAUSE if can_pause else 0)
+            | (self.CAN_NEXT if can_next else 0)
+            | (self.CAN_PREVIOUS if can_previous else 0)
+            | (self.CAN_SEEK if can_seek else 0)
+            | (self.CAN_SHUFFLE if can_shuffle else 0)
+            | (self.CAN_REPEAT if can_repeat else 0)
+        )
+    
+    # Acceso por nombre, compatible con la interfaz anterior
+    can_play = _flag_property(CAN_PLAY, "Permite iniciar la reproducción")
+    can_pause = _flag_property(CAN_PAUSE, "Permite pausar la reproducción")
+    can_next = _flag_property(CAN_NEXT, "Permite pasar a la siguiente pista")
+    can_previous = _flag_property(CAN_PREVIOUS, "Permite volver a la pista anterior")
+    can_seek = _flag_property(CAN_SEEK, "Permite buscar una posición")
+    can_shuffle = _flag_property(CAN_SHUFFLE, "Permite cambiar la reproducción aleatoria")
+    can_repeat = _flag_property(CAN_REPEAT, "Permite cambiar la repetición")
+
+class ProcessSnapshot:
+    """
+    Instantánea de los procesos del sistema compartida por todos los detectores en un ciclo
+    de actualización. Los procesos se enumeran la primera vez que algún detector los pide
+    """
+    
+    __slots__ = ('_names',)
+    
+    def __init__(self):
+        self._names: Optional[Dict[int, str]] = None
+    
+    @property
+    def names(self) -> Dict[int, str]:
+        """Diccionario {pid: nombre del proceso en minúsculas}"""
+        if self._names is None:
+            self._names = {
+                proc.info['pid']: (proc.info['name'] or '').lower()
+                for proc in psutil.process_iter(['pid', 'name'])
+            }
+        return self._names
+    
+    def name(self, pid: int) -> Optional[str]:
+        """Devuelve el nombre en minúsculas del proceso, o None si no existe"""
+        return self.names.get(pid)
 
 class PlayerDetector(ABC):
     """Clase base para detectores de reproductores de música"""
@@ -141,43 +211,43 @@ class PlayerDetector(ABC):
         pass
     
     @abstractmethod
-    def get_current_track(self) -> Optional[MusicInfo]:
-        """Obtiene información sobre la pista actual"""
+    def get_current_track(self, snapshot: Optional[ProcessSnapshot] = None) -> Optional[MusicInfo]:
+        """Obtiene información sobre la pista actual (snapshot: procesos del ciclo actual, si los hay)"""
         pass
     
-    @abstractmethod
+    # Controles de reproducción: por defecto no soportados, los detectores que
+    # puedan controlar el reproductor los sobrescriben (y activan sus PlayerControls)
+    
     def play(self) -> bool:
         """Inicia la reproducción"""
-        pass
+        return False
     
-    @abstractmethod
     def pause(self) -> bool:
         """Pausa la reproducción"""
-        pass
+        return False
     
-    @abstractmethod
     def next_track(self) -> bool:
         """Pasa a la siguiente pista"""
-        pass
+        return False
     
-    @abstractmethod
     def previous_track(self) -> bool:
         """Vuelve a la pista anterior"""
-        pass
+        return False
     
-    @abstractmethod
     def seek(self, position_ms: int) -> bool:
         """Busca una posición específica en la pista actual"""
-        pass
+        return False
     
-    @abstractmethod
     def set_shuffle(self, state: bool) -> bool:
         """Establece el estado de reproducción aleatoria"""
-        pass
+        return False
     
-    @abstractmethod
     def set_repeat(self, state: bool) -> bool:
         """Establece el estado de repetición"""
+        return False
+    
+    def stop(self) -> None:
+        """Detiene los hilos en segundo plano del detector, si los tiene"""
         pass
 
 class MusicDetectionManager:
@@ -187,6 +257,12 @@ class MusicDetectionManager:
         self.detectors: List[PlayerDetector] = []
         self.current_detector: Optional[PlayerDetector] = None
         self.current_track: Optional[MusicInfo] = None
+        
+        # Espera exponencial para detectores que fallan o no tienen pista
+        self._backoff: Dict[str, float] = {}     # Instante a partir del cual volver a consultar
+        self._fail_count: Dict[str, int] = {}
+        self.max_error_backoff = 30.0  # Segundos, tras una excepción
+        self.max_idle_backoff = 4.0    # Segundos, sin pista (corto para detectar pronto la reproducción)
     
     def register_detector(self, detector: PlayerDetector) -> None:
         """Registra un detector de reproductor"""
@@ -202,15 +278,26 @@ class MusicDetectionManager:
                 logging.error(f"Error initializing detector '{detector.name}': {e}")
                 detector.is_available = False
     
+    def stop(self) -> None:
+        """Detiene todos los detectores registrados (al cerrar la aplicación)"""
+        for detector in self.detectors:
+            try:
+                detector.stop()
+            except Exception as e:
+                logging.error(f"Error al detener el detector '{detector.name}': {e}")
+    
     def update(self) -> Optional[MusicInfo]:
         """Actualiza la información de la pista actual de todos los detectores"""
         best_track = None
         best_detector = None
         
+        # Una sola enumeración de procesos por ciclo, compartida por todos los detectores
+        snapshot = ProcessSnapshot()
+        
         # Verificar primero el detector actual si existe
         if self.current_detector and self.current_detector.is_available:
             try:
-                track = self.current_detector.get_current_track()
+                track = self.current_detector.get_current_track(snapshot)
                 if track and track.is_valid() and track.is_playing:
                     self.current_track = track
                     return track
@@ -218,14 +305,23 @@ class MusicDetectionManager:
                 logging.error(f"Error al obtener pista del detector actual '{self.current_detector.name}': {e}")
         
         # Verificar todos los detectores disponibles
+        now = time.monotonic()
         for detector in self.detectors:
             if not detector.is_available:
                 continue
+            
+            # Saltar los detectores en espera tras fallar o no devolver nada
+            if self._backoff.get(detector.name, 0) > now:
+                continue
                 
             try:
-                track = detector.get_current_track()
+                track = detector.get_current_track(snapshot)
                 if not track or not track.is_valid():
+                    self._delay_detector(detector, now, self.max_idle_backoff)
                     continue
+                
+                self._fail_count.pop(detector.name, None)
+                self._backoff.pop(detector.name, None)
                     
                 if track.is_playing:
                     best_track = track
@@ -236,6 +332,7 @@ class MusicDetectionManager:
                     best_detector = detector
             except Exception as e:
                 logging.error(f"Error al obtener pista del detector '{detector.name}': {e}")
+                self._delay_detector(detector, now, self.max_error_backoff)
         
         if best_detector:
             self.current_detector = best_detector
@@ -244,44 +341,50 @@ class MusicDetectionManager:
             
         return None
     
+    def _delay_detector(self, detector: PlayerDetector, now: float, max_delay: float) -> None:
+        """Pospone la siguiente consulta a un detector, duplicando la espera en cada fallo seguido"""
+        fail_count = self._fail_count.get(detector.name, 0) + 1
+        self._fail_count[detector.name] = fail_count
+        self._backoff[detector.name] = now + min(max_delay, 2 ** (fail_count - 1))
+    
     def play(self) -> bool:
         """Reproduce la pista actual"""
-        if self.current_detector and self.current_detector.controls.can_play:
+        if self.current_detector and self.current_detector.controls.flags & PlayerControls.CAN_PLAY:
             return self.current_detector.play()
         return False
     
     def pause(self) -> bool:
         """Pausa la pista actual"""
-        if self.current_detector and self.current_detector.controls.can_pause:
+        if self.current_detector and self.current_detector.controls.flags & PlayerControls.CAN_PAUSE:
             return self.current_detector.pause()
         return False
     
     def next_track(self) -> bool:
         """Pasa a la siguiente pista"""
-        if self.current_detector and self.current_detector.controls.can_next:
+        if self.current_detector and self.current_detector.controls.flags & PlayerControls.CAN_NEXT:
             return self.current_detector.next_track()
         return False
     
     def previous_track(self) -> bool:
         """Vuelve a la pista anterior"""
-        if self.current_detector and self.current_detector.controls.can_previous:
+        if self.current_detector and self.current_detector.controls.flags & PlayerControls.CAN_PREVIOUS:
             return self.current_detector.previous_track()
         return False
     
     def seek(self, position_ms: int) -> bool:
         """Busca una posición específica en la pista actual"""
-        if self.current_detector and self.current_detector.controls.can_seek:
+        if self.current_detector and self.current_detector.controls.flags & PlayerControls.CAN_SEEK:
             return self.current_detector.seek(position_ms)
         return False
     
     def set_shuffle(self, state: bool) -> bool:
         """Establece el estado de reproducción aleatoria"""
-        if self.current_detector and self.current_detector.controls.can_shuffle:
+        if self.current_detector and self.current_detector.controls.flags & PlayerControls.CAN_SHUFFLE:
             return self.current_detector.set_shuffle(state)
         return False
     
     def set_repeat(self, state: bool) -> bool:
         """Establece el estado de repetición"""
-        if self.current_detector and self.current_detector.controls.can_repeat:
+        if self.current_detector and self.current_detector.controls.flags & PlayerControls.CAN_REPEAT:
             return self.current_detector.set_repeat(state)
         return False
\ No newline at end of file
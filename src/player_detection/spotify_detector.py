@@ -1,11 +1,19 @@
 # src/player_detection/spotify_detector.py
 
 import logging
+import threading
 import time
-from typing import Optional
+from operator import itemgetter
+from typing import Optional, Tuple
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
-from .detector import PlayerDetector, MusicInfo, PlayerControls
+from .detector import PlayerDetector, MusicInfo, PlayerControls, ProcessSnapshot
+from ..http_utils import orjson_response_hook
+
+# Accesos y valores vacíos reutilizados en cada sondeo (no se modifican nunca)
+_get_name = itemgetter('name')
+_EMPTY_LIST = ()
+_EMPTY_DICT = {}
 
 class SpotifyDetector(PlayerDetector):
     """Detector para Spotify"""
@@ -16,8 +24,17 @@ class SpotifyDetector(PlayerDetector):
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
         self.sp = None
-        self.last_update_time = 0
-        self.update_interval = 1  # segundos
+        self.update_interval = 1  # segundos (se ajusta según el estado de reproducción)
+        self.idle_interval = 5.0      # Sin reproducción activa
+        self.playing_interval = 1.0   # Reproduciendo
+        self.track_end_interval = 0.5 # Últimos segundos de la pista
+        self.max_result_age = 10.0    # Pasado este tiempo sin respuesta, el resultado se descarta
+        
+        # Las consultas a la API se hacen en un hilo aparte; aquí se guarda el último resultado
+        # como (pista, instante de la consulta, posición en ese instante), reemplazado de una vez
+        self._latest: Optional[Tuple[Optional[MusicInfo], float, int]] = None
+        self._poll_thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
         self.controls = PlayerControls(
             can_play=True,
             can_pause=True,
@@ -36,16 +53,29 @@ class SpotifyDetector(PlayerDetector):
             return False
         
         try:
-            self.sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
+            auth_manager = SpotifyOAuth(
                 client_id=self.client_id,
                 client_secret=self.client_secret,
                 redirect_uri=self.redirect_uri,
                 scope="user-read-playback-state,user-modify-playback-state,user-read-currently-playing"
-            ))
+            )
+            
+            # spotipy ya reutiliza una única sesión HTTP (keep-alive). Sin reintentos internos:
+            # el siguiente sondeo vuelve a consultar, y un reintento bloquearía la actualización
+            self.sp = spotipy.Spotify(
+                auth_manager=auth_manager,
+                requests_timeout=(3, 5),
+                retries=0,
+                status_retries=0
+            )
+            
+            # Decodificar las respuestas JSON de la API con orjson
+            self.sp._session.hooks["response"].append(orjson_response_hook)
             
             # Consideramos el detector disponible independientemente de si hay
             # dispositivos activos, para realizar comprobaciones continuas
             self.is_available = True
+            self._start_polling()
             logging.info("Detector de Spotify inicializado correctamente")
             return True
                 
@@ -54,26 +84,61 @@ class SpotifyDetector(PlayerDetector):
             self.is_available = False
             return False
     
-    def get_current_track(self) -> Optional[MusicInfo]:
-        """Obtiene información sobre la pista actual de Spotify"""
+    def _start_polling(self) -> None:
+        """Arranca el hilo que consulta la API de Spotify sin bloquear al llamador"""
+        if self._poll_thread:
+            return
+        
+        self._poll_thread = threading.Thread(target=self._poll_loop, name="spotify-poll", daemon=True)
+        self._poll_thread.start()
+    
+    def _poll_loop(self) -> None:
+        """Consulta la pista actual periódicamente, con un intervalo según el estado de reproducción"""
+        while self.is_available:
+            self._wake.clear()
+            track = self._fetch_current_track()
+            self._latest = (track, time.monotonic(), track.position_ms if track else 0)
+            
+            if not track or not track.is_playing:
+                self.update_interval = self.idle_interval
+            elif track.duration_ms - track.position_ms < 2000:
+                self.update_interval = self.track_end_interval
+            else:
+                self.update_interval = self.playing_interval
+            
+            # Esperar al siguiente sondeo, o menos si un control de reproducción lo adelanta
+            self._wake.wait(self.update_interval)
+    
+    def stop(self) -> None:
+        """Detiene el hilo de sondeo"""
+        self.is_available = False
+        self._wake.set()
+    
+    def get_current_track(self, snapshot: Optional[ProcessSnapshot] = None) -> Optional[MusicInfo]:
+        """Obtiene información sobre la pista actual de Spotify (último resultado del hilo de sondeo)"""
         if not self.is_available or not self.sp:
             return None
         
-        # Limitar las actualizaciones para evitar alcanzar el límite de la API
-        current_time = time.time()
-        if current_time - self.last_update_time < self.update_interval:
+        latest = self._latest
+        if not latest:
             return None
         
-        self.last_update_time = current_time
+        track, fetched_at, position_ms = latest
+        elapsed = time.monotonic() - fetched_at
+        if elapsed > self.max_result_age:
+            return None
         
+        # Avanzar la posición desde la última consulta si se está reproduciendo
+        if track and track.is_playing:
+            position_ms += int(elapsed * 1000)
+            track.position_ms = min(position_ms, track.duration_ms) if track.duration_ms else position_ms
+        return track
+    
+    def _fetch_current_track(self) -> Optional[MusicInfo]:
+        """Consulta a la API de Spotify la pista actual"""
         try:
-            # Verificar dispositivos primero
-            devices = self.sp.devices()
-            if not devices or not devices.get('devices'):
-                # No hay dispositivos activos, pero seguimos considerando el detector disponible
-                return None
-            
-            # Intentar obtener la reproducción actual
+            # Intentar obtener la reproducción actual (devuelve None si no hay
+            # ningún dispositivo activo, así que no hace falta consultar devices())
             current_playback = None
             try:
                 current_playback = self.sp.current_playback()
@@ -94,10 +159,10 @@ class SpotifyDetector(PlayerDetector):
             if not item:
                 return None
             
-            artists = ", ".join([artist['name'] for artist in item.get('artists', [])])
-            album = item.get('album', {})
+            artists = ", ".join(map(_get_name, item.get('artists') or _EMPTY_LIST))
+            album = item.get('album') or _EMPTY_DICT
             album_name = album.get('name', "")
-            album_images = album.get('images', [])
+            album_images = album.get('images') or _EMPTY_LIST
             album_art_url = album_images[0]['url'] if album_images else ""
             
             # Verificar si está reproduciendo
@@ -128,6 +193,7 @@ class SpotifyDetector(PlayerDetector):
         
         try:
             self.sp.start_playback()
+            self._wake.set()  # Consultar el nuevo estado sin esperar al siguiente sondeo
             return True
         except Exception as e:
             logging.error(f"Error al iniciar la reproducción en Spotify: {e}")
@@ -140,6 +206,7 @@ class SpotifyDetector(PlayerDetector):
         
         try:
             self.sp.pause_playback()
+            self._wake.set()  # Consultar el nuevo estado sin esperar al siguiente sondeo
             return True
         except Exception as e:
             logging.error(f"Error al pausar la reproducción en Spotify: {e}")
@@ -152,6 +219,7 @@ class SpotifyDetector(PlayerDetector):
         
         try:
             self.sp.next_track()
+            self._wake.set()  # Consultar el nuevo estado sin esperar al siguiente sondeo
             return True
         except Exception as e:
             logging.error(f"Error al pasar a la siguiente pista en Spotify: {e}")
@@ -164,6 +232,7 @@ class SpotifyDetector(PlayerDetector):
         
         try:
             self.sp.previous_track()
+            self._wake.set()  # Consultar el nuevo estado sin esperar al siguiente sondeo
             return True
         except Exception as e:
             logging.error(f"Error al volver a la pista anterior en Spotify: {e}")
@@ -176,6 +245,7 @@ class SpotifyDetector(PlayerDetector):
         
         try:
             self.sp.seek_track(position_ms)
+            self._wake.set()  # Consultar el nuevo estado sin esperar al siguiente sondeo
             return True
         except Exception as e:
             logging.error(f"Error al buscar posición en Spotify: {e}")
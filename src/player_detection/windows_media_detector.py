@@ -1,22 +1,101 @@
 # src/player_detection/windows_media_detector.py
 
+import asyncio
+import hashlib
 import logging
+import re
+import threading
 import time
-import winreg
 import ctypes
-from typing import Optional, Dict, List
-import os
-import sys
+from functools import lru_cache
+from typing import Optional, Dict, List, Tuple
 import pythoncom
-import win32com.client
+import pywintypes
 import win32gui
 import win32process
-import psutil
-from comtypes import CLSCTX_ALL
-from pycaw.pycaw import AudioUtilities, IAudioSessionControl, IAudioSessionControl2
-import pygetwindow
 
-from .detector import PlayerDetector, MusicInfo, PlayerControls
+from .detector import PlayerDetector, MusicInfo, PlayerControls, ProcessSnapshot
+
+# Funciones de Win32 (instancias propias de ctypes para no alterar los prototipos de ctypes.windll)
+_user32 = ctypes.WinDLL("user32")
+_user32.keybd_event.argtypes = [ctypes.c_ubyte, ctypes.c_ubyte, ctypes.c_ulong, ctypes.c_void_p]
+_user32.keybd_event.restype = None
+
+# Teclas multimedia virtuales
+VK_MEDIA_NEXT_TRACK = 0xB0
+VK_MEDIA_PREV_TRACK = 0xB1
+VK_MEDIA_PLAY_PAUSE = 0xB3
+KEYEVENTF_KEYUP = 0x0002
+
+# Segundos tras usar un control a los que se vuelve a escanear: el reproductor tarda
+# un momento en cambiar el título de su ventana, y a veces más de lo habitual
+_CONTROL_RESCAN_DELAYS = (0.3, 1.5)
+
+def _tap(vk: int) -> None:
+    """Pulsa y suelta una tecla virtual"""
+    _user32.keybd_event(vk, 0, 0, None)
+    _user32.keybd_event(vk, 0, KEYEVENTF_KEYUP, None)
+
+@lru_cache(maxsize=256)
+def _stable_id(text: str) -> str:
+    """Hash de 64 bits estable entre ejecuciones (hash() de Python cambia en cada arranque)"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+# Patrones de título de ventana de cada reproductor
+_SPOTIFY_TITLE = re.compile(r'(?P<title>.*?) - (?P<artist>.*?)(?: - .*)? - Spotify$')
+_YTMUSIC_TITLE = re.compile(r'(?P<title>.*?) - (?P<artist>.*?)(?: - .*?)? - YouTube Music')
+_YOUTUBE_TITLE = re.compile(r'(?P<title>.*?) - YouTube')
+_GENERIC_TITLE = re.compile(r'(?P<artist>.*?) - (?P<title>.*?)(?: - |$)')
+
+# Cada analizador devuelve (título, artista, reproductor, ID de pista) a partir de la coincidencia
+
+def _spotify_fields(match, process_name: str) -> Tuple[str, str, str, str]:
+    """Título "Canción - Artista - Spotify" """
+    track_title = match['title'].strip()
+    artist = match['artist'].strip()
+    return track_title, artist, "Spotify", f"spotify:{artist}:{track_title}".lower()
+
+def _ytmusic_fields(match, process_name: str) -> Tuple[str, str, str, str]:
+    """Título "Canción - Artista - YouTube Music" """
+    track_title = match['title'].strip()
+    artist = match['artist'].strip()
+    return track_title, artist, "YouTube Music", f"ytmusic:{artist}:{track_title}".lower()
+
+def _youtube_fields(match, process_name: str) -> Optional[Tuple[str, str, str, str]]:
+    """Título "Vídeo - YouTube" """
+    track_title = match['title'].strip()
+    if len(track_title) <= 3:  # Ignorar títulos muy cortos
+        return None
+    return track_title, "YouTube", "YouTube", f"youtube_{_stable_id(track_title)}"
+
+def _generic_fields(match, process_name: str) -> Tuple[str, str, str, str]:
+    """Título "Artista - Título" (Windows Media Player y otros)"""
+    track_title = match['title'].strip()
+    artist = match['artist'].strip()
+    player_name = process_name.replace(".exe", "").capitalize()
+    return track_title, artist, player_name, f"generic:{artist}:{track_title}".lower()
+
+# Analizadores de título por proceso: (patrón, analizador), probados en orden
+_BROWSER_PARSERS = ((_YTMUSIC_TITLE, _ytmusic_fields), (_YOUTUBE_TITLE, _youtube_fields))
+_GENERIC_PARSERS = ((_GENERIC_TITLE, _generic_fields),)
+_TITLE_PARSERS = {
+    "spotify.exe": ((_SPOTIFY_TITLE, _spotify_fields),) + _GENERIC_PARSERS,
+    "chrome.exe": _BROWSER_PARSERS,
+    "msedge.exe": _BROWSER_PARSERS,
+    "firefox.exe": _BROWSER_PARSERS
+}
+
+@lru_cache(maxsize=128)
+def _parse_title(process_name: str, title: str) -> Optional[Tuple[str, str, str, str]]:
+    """
+    Analiza el título de una ventana con el primer patrón de su reproductor que coincida.
+    Los títulos cambian poco entre sondeos, así que el resultado (solo datos) se memoriza
+    """
+    for pattern, fields in _TITLE_PARSERS.get(process_name, _GENERIC_PARSERS):
+        match = pattern.match(title)
+        if match:
+            return fields(match, process_name)
+    return None
 
 class WindowsMediaDetector(PlayerDetector):
     """
@@ -31,11 +110,33 @@ class WindowsMediaDetector(PlayerDetector):
     4. Estimación automática de posición entre actualizaciones
     """
     
+    # Reproductores soportados (nombres de proceso en minúsculas)
+    SUPPORTED_PLAYERS = frozenset((
+        "spotify.exe", 
+        "chrome.exe", 
+        "msedge.exe", 
+        "firefox.exe", 
+        "musicbee.exe", 
+        "vlc.exe", 
+        "winamp.exe", 
+        "itunes.exe", 
+        "groove.exe", 
+        "wmplayer.exe", 
+        "foobar2000.exe"
+    ))
+    
     def __init__(self):
         super().__init__("Windows Media")
-        self.last_update_time = 0
+        self._last_scan_time = 0.0  # Instante del último escaneo, para avanzar la posición
+        self._scanner_thread: Optional[threading.Thread] = None
+        self._wake_scanner = threading.Event()
+        self._stop_event = threading.Event()  # Detiene todos los hilos del detector (stop)
+        # Escaneos adicionales pedidos por los controles (instantes de time.monotonic) y si el
+        # último control cambió de pista; ambos los consume el hilo de escaneo
+        self._control_lock = threading.Lock()
+        self._rescans: List[float] = []
+        self._skip_pending = False
         self.update_interval = 5  # Aumentado a 5 segundos para reducir frecuencia de actualizaciones
-        self.media_sessions = []
         self.controls = PlayerControls(
             can_play=True,
             can_pause=True,
@@ -45,25 +146,24 @@ class WindowsMediaDetector(PlayerDetector):
             can_shuffle=False,
             can_repeat=False
         )
-        self.current_track_info = None
-        self.last_track_signature = ""
         # Variables para el mecanismo de estabilidad
         self.last_detected_track = None  # Caché de la última pista detectada
         self.track_stable_count = 0      # Contador de veces que se ha detectado la misma pista
-        # Lista de reproductores soportados
-        self.SUPPORTED_PLAYERS = [
-            "spotify.exe", 
-            "chrome.exe", 
-            "msedge.exe", 
-            "firefox.exe", 
-            "musicbee.exe", 
-            "vlc.exe", 
-            "winamp.exe", 
-            "itunes.exe", 
-            "groove.exe", 
-            "wmplayer.exe", 
-            "foobar2000.exe"
-        ]
+        # Estado de SMTC: la pista se actualiza solo cuando Windows notifica un cambio.
+        # Se guarda como (pista, instante de la notificación, posición en ese instante)
+        self._smtc_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._smtc_manager = None
+        self._smtc_session = None
+        self._smtc_tokens: List[Tuple[str, object]] = []
+        self._smtc_latest: Optional[Tuple[Optional[MusicInfo], float, int]] = None
+        self._smtc_active = False
+        self._session_manager_type = None
+        self._playing_status = None
+        self._audio_utilities = None
+        self._session_control2 = None
+        self._audio_session_manager = None  # IAudioSessionManager2, creado en el hilo que lo usa
+        # Caché {pid: nombre del proceso en minúsculas} de las sesiones de audio vistas
+        self._pname_by_pid: Dict[int, str] = {}
     
     def initialize(self) -> bool:
         """Inicializa la detección de reproductores de Windows"""
@@ -71,222 +171,294 @@ class WindowsMediaDetector(PlayerDetector):
             # Inicializamos COM
             pythoncom.CoInitialize()
             self.is_available = True
+            
+            # Preferir las notificaciones de SMTC al sondeo si WinRT está disponible
+            self._start_smtc()
+            
+            # Sin SMTC, escanear en un hilo aparte para no bloquear al llamador
+            # (pycaw y comtypes solo se cargan si hace falta el sondeo)
+            if not self._smtc_active:
+                from pycaw.pycaw import AudioUtilities, IAudioSessionControl2
+                self._audio_utilities = AudioUtilities
+                self._session_control2 = IAudioSessionControl2
+                self._start_scanner()
             return True
         except Exception as e:
             logging.error(f"Error al inicializar WindowsMediaDetector: {e}")
             self.is_available = False
             return False
     
-    def get_current_track(self):
-        """Obtiene información sobre la pista actual"""
+    def _start_smtc(self) -> None:
+        """Arranca el bucle de eventos que atiende las notificaciones de SMTC"""
+        # Controles multimedia del sistema (SMTC) a través de WinRT; opcional, si no está
+        # instalado se usa la detección por sesiones de audio y títulos de ventana
+        try:
+            from winsdk.windows.media.control import (
+                GlobalSystemMediaTransportControlsSessionManager,
+                GlobalSystemMediaTransportControlsSessionPlaybackStatus
+            )
+        except ImportError:
+            return
+        self._session_manager_type = GlobalSystemMediaTransportControlsSessionManager
+        self._playing_status = GlobalSystemMediaTransportControlsSessionPlaybackStatus.PLAYING
+        
+        self._smtc_loop = asyncio.new_event_loop()
+        threading.Thread(target=self._smtc_loop.run_forever, name="smtc-events", daemon=True).start()
+        
+        try:
+            future = asyncio.run_coroutine_threadsafe(self._smtc_setup(), self._smtc_loop)
+            future.result(timeout=5)
+            self._smtc_active = True
+            logging.info("Detección por SMTC activa")
+        except Exception as e:
+            logging.warning(f"No se pudo usar SMTC, se usará la detección por sondeo: {e}")
+            self._smtc_loop.call_soon_threadsafe(self._smtc_loop.stop)
+            self._smtc_loop = None
+    
+    async def _smtc_setup(self) -> None:
+        """Obtiene el gestor de sesiones de SMTC y se suscribe a sus cambios"""
+        self._smtc_manager = await self._session_manager_type.request_async()
+        self._smtc_manager.add_current_session_changed(
+            lambda sender, args: self._schedule_smtc_refresh()
+        )
+        await self._refresh_smtc()
+    
+    def _schedule_smtc_refresh(self) -> None:
+        """Callback de WinRT (en un hilo del sistema): actualiza la pista en el bucle de SMTC"""
+        if self._smtc_loop:
+            asyncio.run_coroutine_threadsafe(self._refresh_smtc(), self._smtc_loop)
+    
+    def _watch_smtc_session(self, session) -> None:
+        """Se suscribe a los cambios de la sesión actual, dejando de escuchar la anterior"""
+        if self._smtc_session is not None:
+            for event, token in self._smtc_tokens:
+                try:
+                    getattr(self._smtc_session, f"remove_{event}")(token)
+                except Exception:
+                    pass
+        self._smtc_tokens = []
+        self._smtc_session = session
+        
+        if session is None:
+            return
+        
+        handler = lambda sender, args: self._schedule_smtc_refresh()
+        for event in ("media_properties_changed", "playback_info_changed", "timeline_properties_changed"):
+            token = getattr(session, f"add_{event}")(handler)
+            self._smtc_tokens.append((event, token))
+    
+    async def _refresh_smtc(self) -> None:
+        """Lee la sesión actual de SMTC y guarda la pista resultante"""
         try:
-            # Controlar frecuencia de actualización
-            current_time = time.time()
-            if current_time - self.last_update_time < self.update_interval:
-                # Si no ha pasado suficiente tiempo, devolvemos la última información detectada
-                return self.last_detected_track
+            session = self._smtc_manager.get_current_session()
+            if not self._same_smtc_session(session):
+                self._watch_smtc_session(session)
+            
+            if session is None:
+                self._smtc_latest = (None, time.monotonic(), 0)
+                return
             
-            self.last_update_time = current_time
+            props = await session.try_get_media_properties_async()
+            playback = session.get_playback_info()
+            timeline = session.get_timeline_properties()
             
-            # Usar AudioUtilities de pycaw para obtener sesiones de audio
-            sessions = AudioUtilities.GetAllSessions()
+            duration_ms = int((timeline.end_time - timeline.start_time).total_seconds() * 1000)
+            position_ms = int((timeline.position - timeline.start_time).total_seconds() * 1000)
+            
+            track = MusicInfo(
+                title=props.title or "",
+                artist=props.artist or "",
+                album=props.album_title or "",
+                duration_ms=max(duration_ms, 0),
+                position_ms=max(position_ms, 0),
+                is_playing=playback.playback_status == self._playing_status,
+                player_name=self._smtc_player_name(session.source_app_user_model_id)
+            )
+            self._smtc_latest = (track if track.is_valid() else None, time.monotonic(), track.position_ms)
+        except Exception as e:
+            logging.error(f"Error al leer la sesión de SMTC: {e}")
+    
+    def _same_smtc_session(self, session) -> bool:
+        """Indica si la sesión es la misma a la que ya estamos suscritos"""
+        if session is None or self._smtc_session is None:
+            return session is self._smtc_session
+        return session.source_app_user_model_id == self._smtc_session.source_app_user_model_id
+    
+    def _smtc_player_name(self, app_id: str) -> str:
+        """Nombre legible del reproductor a partir del identificador de aplicación de SMTC"""
+        name = (app_id or "").rsplit("\\", 1)[-1].rsplit("!", 1)[-1]
+        if name.lower().endswith(".exe"):
+            name = name[:-4]
+        return name.capitalize() if name.islower() else name
+    
+    def get_current_track(self, snapshot: Optional[ProcessSnapshot] = None):
+        """Obtiene información sobre la pista actual"""
+        if self._smtc_active:
+            return self._get_smtc_current_track()
+        # El hilo de escaneo mantiene la última pista detectada
+        return self.last_detected_track
+    
+    def _get_smtc_current_track(self) -> Optional[MusicInfo]:
+        """Devuelve la última pista notificada por SMTC, avanzando la posición si se reproduce"""
+        latest = self._smtc_latest
+        if not latest or not latest[0]:
+            return None
+        
+        track, updated_at, position_ms = latest
+        if track.is_playing:
+            position_ms += int((time.monotonic() - updated_at) * 1000)
+            track.position_ms = min(position_ms, track.duration_ms) if track.duration_ms else position_ms
+        return track
+    
+    def _start_scanner(self) -> None:
+        """Arranca el hilo que escanea sesiones de audio y ventanas sin bloquear al llamador"""
+        self._scanner_thread = threading.Thread(target=self._scan_loop, name="windows-media-scan", daemon=True)
+        self._scanner_thread.start()
+    
+    def _scan_loop(self) -> None:
+        """Escanea periódicamente y publica el resultado en last_detected_track"""
+        # COM se inicializa una vez para todo el hilo
+        pythoncom.CoInitialize()
+        try:
+            next_scan = time.monotonic()
+            while self.is_available and not self._stop_event.is_set():
+                # Esperar al siguiente escaneo periódico o al primero que haya pedido un control
+                with self._control_lock:
+                    deadline = min([next_scan] + self._rescans[:1])
+                timeout = deadline - time.monotonic()
+                if timeout > 0:
+                    self._wake_scanner.wait(timeout)
+                    self._wake_scanner.clear()
+                    continue
+                
+                with self._control_lock:
+                    now = time.monotonic()
+                    self._rescans = [t for t in self._rescans if t > now]
+                    after_skip = self._skip_pending
+                    # Tras el último escaneo de seguimiento ya no se espera un cambio de pista
+                    if not self._rescans:
+                        self._skip_pending = False
+                
+                self._scan_current_track(after_skip=after_skip)
+                next_scan = time.monotonic() + self.update_interval
+        finally:
+            pythoncom.CoUninitialize()
+    
+    def stop(self) -> None:
+        """Detiene los hilos de escaneo y de SMTC"""
+        self._stop_event.set()
+        self._wake_scanner.set()
+        
+        loop = self._smtc_loop
+        if loop:
+            self._smtc_loop = None
+            loop.call_soon_threadsafe(self._stop_smtc, loop)
+    
+    def _stop_smtc(self, loop: asyncio.AbstractEventLoop) -> None:
+        """En el bucle de SMTC: deja de escuchar la sesión actual y detiene el bucle"""
+        self._watch_smtc_session(None)
+        loop.stop()
+    
+    def _scan_current_track(self, snapshot: Optional[ProcessSnapshot] = None, after_skip: bool = False):
+        """
+        Obtiene la pista actual a partir de las sesiones de audio y los títulos de ventana
+        (con after_skip, una pista distinta tras pasar de canción empieza desde el principio)
+        """
+        # Tiempo real transcurrido desde el escaneo anterior (el intervalo no es exacto)
+        now = time.monotonic()
+        elapsed_ms = int((now - self._last_scan_time) * 1000) if self._last_scan_time else 0
+        self._last_scan_time = now
+        
+        try:
+            # Si no se está ejecutando ningún reproductor soportado, no hace falta
+            # consultar las sesiones de audio ni recorrer las ventanas
+            snapshot = snapshot or ProcessSnapshot()
+            if self.SUPPORTED_PLAYERS.isdisjoint(snapshot.names.values()):
+                self.last_detected_track = None
+                self.track_stable_count = 0
+                return None
+            
+            # PID de las sesiones de audio, leídos en una sola pasada antes de recorrer las ventanas
+            session_pids = self._session_pids()
             
             # Lista para almacenar procesos de reproductor detectados
             detected_players = []
             
             # Primero, identificamos procesos que podrían ser reproductores de música
-            for session in sessions:
-                if session.Process and session.Process.name().lower() in self.SUPPORTED_PLAYERS:
+            pname_by_pid = {}
+            for pid in session_pids:
+                process_name = self._pname(pid, snapshot)
+                pname_by_pid[pid] = process_name
+                if process_name in self.SUPPORTED_PLAYERS:
                     is_playing = True  # Suponemos que está reproduciendo si tiene una sesión activa
                     detected_players.append({
-                        'process': session.Process,
+                        'pid': pid,
+                        'name': process_name,
                         'is_playing': is_playing
                     })
             
+            # Conservar solo los procesos que siguen vivos (un PID puede reutilizarse)
+            self._pname_by_pid = pname_by_pid
+            
             # Si no hay reproductores detectados, salir
             if not detected_players:
                 self.last_detected_track = None
                 self.track_stable_count = 0
                 return None
             
-            # Buscar información en ventanas activas de los procesos detectados
-            detected_track = None
+            # Buscar información en ventanas activas de los procesos detectados,
+            # recorriendo las ventanas una sola vez para todos los reproductores
+            windows_by_pid = self._windows_by_pid({player['pid'] for player in detected_players})
             
-            for player in detected_players:
-                process = player['process']
-                
-                # Obtener todas las ventanas con título
-                windows = pygetwindow.getWindowsWithTitle('')
-                
-                for window in windows:
-                    if not window.title:
-                        continue
-                    
-                    # Verificar si esta ventana pertenece al proceso actual
-                    try:
-                        win_pid = win32process.GetWindowThreadProcessId(window._hWnd)[1]
-                        if win_pid != process.pid:
-                            continue
-                    except Exception:
-                        continue
-                    
-                    title = window.title.strip()
-                    process_name = process.name().lower()
-                    
-                    # Spotify
-                    if process_name == "spotify.exe" and " - " in title and title.endswith(" - Spotify"):
-                        title = title[:-10]  # Eliminar " - Spotify"
-                        parts = title.split(" - ")
-                        
-                        if len(parts) >= 2:
-                            track_title = parts[0].strip()
-                            artist = parts[1].strip()
-                            
-                            # ID estable para Spotify
-                            unique_id = f"spotify:{artist}:{track_title}".lower()
-                            
-                            # Obtener duración y posición
-                            duration_ms, position_ms = self._get_track_position()
-                            is_playing = player['is_playing']
-                            
-                            detected_track = MusicInfo(
-                                title=track_title,
-                                artist=artist,
-                                album="",
-                                album_art_url="",
-                                duration_ms=duration_ms,
-                                position_ms=position_ms,
-                                is_playing=is_playing,
-                                player_name="Spotify",
-                                track_id=unique_id
-                            )
-                            break
-                    
-                    # Navegadores (YouTube, YouTube Music, etc.)
-                    elif process_name in ["chrome.exe", "msedge.exe", "firefox.exe"]:
-                        # YouTube Music
-                        if " - YouTube Music" in title:
-                            parts = title.replace(" - YouTube Music", "").split(" - ")
-                            if len(parts) >= 2:
-                                track_title = parts[0].strip()
-                                artist = parts[1].strip()
-                                
-                                # ID estable para YouTube Music
-                                unique_id = f"ytmusic:{artist}:{track_title}".lower()
-                                
-                                # Obtener duración y posición
-                                duration_ms, position_ms = self._get_track_position()
-                                is_playing = player['is_playing']
-                                
-                                detected_track = MusicInfo(
-                                    title=track_title,
-                                    artist=artist,
-                                    album="",
-                                    album_art_url="",
-                                    duration_ms=duration_ms,
-                                    position_ms=position_ms,
-                                    is_playing=is_playing,
-                                    player_name="YouTube Music",
-                                    track_id=unique_id
-                                )
-                                break
-                        
-                        # YouTube
-                        elif " - YouTube" in title:
-                            track_title = title.replace(" - YouTube", "").strip()
-                            if len(track_title) > 3:  # Ignorar títulos muy cortos
-                                # Obtener duración y posición
-                                duration_ms, position_ms = self._get_track_position()
-                                is_playing = player['is_playing']
-                                
-                                detected_track = MusicInfo(
-                                    title=track_title,
-                                    artist="YouTube",
-                                    album="",
-                                    album_art_url="",
-                                    duration_ms=duration_ms,
-                                    position_ms=position_ms,
-                                    is_playing=is_playing,
-                                    player_name="YouTube",
-                                    track_id=f"youtube_{hash(track_title) % 1000000}"
-                                )
-                                break
-                    
-                    # Detector genérico con formato "Artista - Título" para Windows Media Player y otros
-                    elif " - " in title:
-                        parts = title.split(" - ")
-                        if len(parts) >= 2:
-                            try:
-                                artist = parts[0].strip()
-                                track_title = parts[1].strip()
-                                
-                                # ID estable para el reproductor genérico
-                                unique_id = f"generic:{artist}:{track_title}".lower()
-                                
-                                # Obtener duración y posición
-                                duration_ms, position_ms = self._get_track_position()
-                                is_playing = player['is_playing']
-                                
-                                detected_track = MusicInfo(
-                                    title=track_title,
-                                    artist=artist,
-                                    album="",
-                                    album_art_url="",
-                                    duration_ms=duration_ms,
-                                    position_ms=position_ms,
-                                    is_playing=is_playing,
-                                    player_name=process_name.replace(".exe", "").capitalize(),
-                                    track_id=unique_id
-                                )
-                                break
-                            except Exception as e:
-                                logging.debug(f"Error al parsear título de ventana genérico: {e}")
-                
-                if detected_track:
-                    break
+            # Primera ventana cuyo título se pueda analizar: (título, artista, reproductor, ID, reproduciendo)
+            found = next(
+                (
+                    parsed + (player['is_playing'],)
+                    for player in detected_players
+                    for title in windows_by_pid.get(player['pid'], ())
+                    if (parsed := _parse_title(player['name'], title))
+                ),
+                None
+            )
             
             # Si no pudimos obtener detalles del reproductor pero hay uno activo, devolver información genérica
-            if not detected_track and detected_players:
-                process = detected_players[0]['process']
-                process_name = process.name().lower()
-                player_name = process_name.replace(".exe", "").capitalize()
-                # Obtener duración y posición
-                duration_ms, position_ms = self._get_track_position()
-                is_playing = True
-                
-                detected_track = MusicInfo(
-                    title=f"Reproduciendo en {player_name}",
-                    artist="",
-                    album="",
-                    album_art_url="",
-                    duration_ms=duration_ms,
-                    position_ms=position_ms,
-                    is_playing=is_playing,
-                    player_name=player_name,
-                    track_id=f"{player_name.lower().replace(' ', '_')}_player"
-                )
+            if not found:
+                player_name = detected_players[0]['name'].replace(".exe", "").capitalize()
+                track_id = f"{player_name.lower().replace(' ', '_')}_player"
+                found = (f"Reproduciendo en {player_name}", "", player_name, track_id, True)
             
-            # Mecanismo de estabilidad: comparar con la pista anterior para evitar cambios constantes
-            if self.last_detected_track and detected_track:
-                # Comparar títulos y artistas para determinar si es la misma pista
-                last_track_id = self.last_detected_track.get_unique_id()
-                current_track_id = detected_track.get_unique_id()
+            track_title, artist, player_name, track_id, is_playing = found
+            
+            # Mecanismo de estabilidad: si es la misma pista que la anterior, actualizar
+            # solo su posición sobre el mismo objeto en lugar de crear uno nuevo
+            last_track = self.last_detected_track
+            if last_track and last_track.track_id == track_id:
+                self.track_stable_count += 1
+                last_track.position_ms = min(last_track.position_ms + elapsed_ms, last_track.duration_ms)
                 
-                if last_track_id == current_track_id:
-                    # Es la misma pista, actualizar solo la posición
-                    self.track_stable_count += 1
-                    detected_track.position_ms = self.last_detected_track.position_ms + (self.update_interval * 1000)
-                    
-                    # Limitar la posición a la duración
-                    if detected_track.position_ms > detected_track.duration_ms:
-                        detected_track.position_ms = detected_track.duration_ms
-                else:
-                    # Es una pista diferente, reiniciar el contador de estabilidad
-                    self.track_stable_count = 0
-                    
                 # Si hemos visto la misma pista varias veces, mantener is_playing
-                if self.track_stable_count > 1:
-                    detected_track.is_playing = self.last_detected_track.is_playing
+                if self.track_stable_count <= 1:
+                    last_track.is_playing = is_playing
+                return last_track
+            
+            # Es una pista diferente, reiniciar el contador de estabilidad
+            self.track_stable_count = 0
+            duration_ms, position_ms = self._get_track_position()
+            if after_skip:
+                position_ms = 0
+                with self._control_lock:
+                    self._skip_pending = False
+            detected_track = MusicInfo(
+                title=track_title,
+                artist=artist,
+                album="",
+                album_art_url="",
+                duration_ms=duration_ms,
+                position_ms=position_ms,
+                is_playing=is_playing,
+                player_name=player_name,
+                track_id=track_id
+            )
             
             # Actualizar la pista detectada para la próxima iteración
             self.last_detected_track = detected_track
@@ -296,197 +468,109 @@ class WindowsMediaDetector(PlayerDetector):
             logging.error(f"Error al detectar pista actual: {e}")
             return self.last_detected_track
     
-    def _get_browser_track_info(self, pid: int) -> Optional[MusicInfo]:
-        """Intenta obtener información de la pista de un navegador"""
+    def _session_pids(self) -> List[int]:
+        """
+        PID de todas las sesiones de audio, leídos directamente del enumerador de
+        IAudioSessionManager2 sin crear los objetos AudioSession/Process de pycaw
+        """
+        if self._audio_session_manager is None:
+            self._audio_session_manager = self._audio_utilities.GetAudioSessionManager()
+            if self._audio_session_manager is None:
+                return []
+        
         try:
-            # Obtener todas las ventanas del proceso
-            def enum_window_callback(hwnd, windows):
-                _, found_pid = win32process.GetWindowThreadProcessId(hwnd)
-                if found_pid == pid and win32gui.IsWindowVisible(hwnd):
-                    windows.append(hwnd)
+            enumerator = self._audio_session_manager.GetSessionEnumerator()
+            pids = []
+            for i in range(enumerator.GetCount()):
+                session = enumerator.GetSession(i)
+                if session is None:
+                    continue
+                pid = session.QueryInterface(self._session_control2).GetProcessId()
+                if pid:
+                    pids.append(pid)
+        except Exception:
+            # El dispositivo de audio puede haber cambiado: pedir el gestor de nuevo en el próximo escaneo
+            self._audio_session_manager = None
+            raise
+        
+        if not pids:
+            # Sin sesiones puede que el dispositivo predeterminado haya cambiado
+            self._audio_session_manager = None
+        return pids
+    
+    def _pname(self, pid: int, snapshot: ProcessSnapshot) -> str:
+        """Nombre en minúsculas del proceso, consultado una sola vez por PID"""
+        name = self._pname_by_pid.get(pid)
+        if name is None:
+            name = snapshot.name(pid) or ""
+        return name
+    
+    def _windows_by_pid(self, pids) -> Dict[int, List[str]]:
+        """Recorre las ventanas una vez y agrupa por PID los títulos de los procesos indicados"""
+        windows: Dict[int, List[str]] = {}
+        
+        def collect(hwnd, _):
+            # Filtrar primero por PID (barato) y leer el título solo de las ventanas que interesan
+            try:
+                pid = win32process.GetWindowThreadProcessId(hwnd)[1]
+            except pywintypes.error:
                 return True
             
-            windows = []
-            win32gui.EnumWindows(enum_window_callback, windows)
-            
-            for hwnd in windows:
+            if pid in pids and win32gui.IsWindowVisible(hwnd):
                 title = win32gui.GetWindowText(hwnd)
-                
-                # Verificar si el título contiene patrones de reproductores web
-                if " - YouTube" in title:
-                    # Formato típico: "Nombre de la canción - YouTube"
-                    track_title = title.replace(" - YouTube", "").strip()
-                    # Crear un track_id basado en el título para estabilidad
-                    track_id = f"youtube_{hash(track_title) % 1000000}"
-                    
-                    # Obtener duración y posición
-                    duration_ms, position_ms = self._get_track_position()
-                    is_playing = True
-                    
-                    return MusicInfo(
-                        title=track_title,
-                        artist="YouTube",
-                        album="",
-                        player_name="YouTube",
-                        is_playing=is_playing,
-                        track_id=track_id,
-                        duration_ms=duration_ms,
-                        position_ms=position_ms
-                    )
-                elif " | Spotify" in title:
-                    # Formato típico: "Artista - Canción | Spotify"
-                    track_info = title.replace(" | Spotify", "").strip()
-                    if " - " in track_info:
-                        artist, track_title = track_info.split(" - ", 1)
-                        # Crear un track_id basado en el título y artista para estabilidad
-                        track_id = f"spotify_web_{hash(artist + track_title) % 1000000}"
-                        
-                        # Obtener duración y posición
-                        duration_ms, position_ms = self._get_track_position()
-                        is_playing = True
-                        
-                        return MusicInfo(
-                            title=track_title,
-                            artist=artist,
-                            album="",
-                            player_name="Spotify Web",
-                            is_playing=is_playing,
-                            track_id=track_id,
-                            duration_ms=duration_ms,
-                            position_ms=position_ms
-                        )
-            
-            return None
-            
-        except Exception as e:
-            logging.error(f"Error al obtener información del navegador: {e}")
-            return None
+                if title:
+                    windows.setdefault(pid, []).append(title.strip())
+            return True
+        
+        win32gui.EnumWindows(collect, None)
+        return windows
     
-    def _get_smtc_track_info(self, process_name: str) -> Optional[MusicInfo]:
-        """Intenta obtener información de la pista usando SMTC (System Media Transport Controls)"""
-        try:
-            # Esta es una simulación ya que no podemos implementar SMTC completo sin C#/C++
-            # En una implementación real, usaríamos Windows.Media.Control namespace
-            
-            # Intentamos obtener información básica del registro para algunos reproductores
-            if process_name == "spotify.exe":
-                try:
-                    key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Spotify\Spotify")
-                    value, _ = winreg.QueryValueEx(key, "LastPlaylist")
-                    winreg.CloseKey(key)
-                    
-                    # Solo podemos determinar que Spotify está activo
-                    return MusicInfo(
-                        title="Reproduciendo en Spotify",
-                        artist="",
-                        album="",
-                        player_name="Spotify",
-                        is_playing=True,
-                        track_id="spotify_player",  # Añadir un track_id estable
-                        duration_ms=180000,  # 3 minutos por defecto
-                        position_ms=0
-                    )
-                except:
-                    pass
-            
-            # Para otros reproductores, solo podemos detectar que están activos
-            player_name_map = {
-                "spotify.exe": "Spotify",
-                "musicbee.exe": "MusicBee",
-                "vlc.exe": "VLC",
-                "winamp.exe": "Winamp",
-                "itunes.exe": "iTunes",
-                "groove.exe": "Groove Music",
-                "wmplayer.exe": "Windows Media Player",
-                "foobar2000.exe": "foobar2000"
-            }
-            
-            player_name = player_name_map.get(process_name, process_name)
-            
-            # Crear un track_id estable basado en el nombre del reproductor
-            track_id = f"{player_name.lower().replace(' ', '_')}_player"
-            
-            # Obtener duración y posición
-            duration_ms, position_ms = self._get_track_position()
-            is_playing = True
-            
-            return MusicInfo(
-                title=f"Reproduciendo en {player_name}",
-                artist="",
-                album="",
-                player_name=player_name,
-                is_playing=is_playing,
-                track_id=track_id,  # Añadir un track_id estable
-                duration_ms=duration_ms,
-                position_ms=position_ms
-            )
-            
-        except Exception as e:
-            logging.error(f"Error al obtener información SMTC: {e}")
-            return None
+    def _flush(self, skipped: bool = False) -> None:
+        """
+        Programa escaneos poco después de usar un control, cuando el reproductor ya ha
+        actualizado el título de su ventana (skipped indica que se cambió de pista)
+        """
+        now = time.monotonic()
+        with self._control_lock:
+            self._rescans = [now + delay for delay in _CONTROL_RESCAN_DELAYS]
+            if skipped:
+                self._skip_pending = True
+        self._wake_scanner.set()
     
     def play(self) -> bool:
         """Inicia la reproducción"""
-        # Simular combinación de teclas para reproducir
-        try:
-            import pyautogui
-            pyautogui.press('playpause')
-            # Actualizar el estado de la reproducción
-            if self.last_detected_track:
-                self.last_detected_track.is_playing = True
-            return True
-        except:
-            return False
+        # Simular la tecla multimedia de reproducir/pausar
+        _tap(VK_MEDIA_PLAY_PAUSE)
+        self._flush()
+        # Actualizar el estado de la reproducción
+        if self.last_detected_track:
+            self.last_detected_track.is_playing = True
+        return True
     
     def pause(self) -> bool:
         """Pausa la reproducción"""
-        # Simular combinación de teclas para pausar
-        try:
-            import pyautogui
-            pyautogui.press('playpause')
-            # Actualizar el estado de la reproducción
-            if self.last_detected_track:
-                self.last_detected_track.is_playing = False
-            return True
-        except:
-            return False
+        # Simular la tecla multimedia de reproducir/pausar
+        _tap(VK_MEDIA_PLAY_PAUSE)
+        self._flush()
+        # Actualizar el estado de la reproducción
+        if self.last_detected_track:
+            self.last_detected_track.is_playing = False
+        return True
     
     def next_track(self) -> bool:
         """Pasa a la siguiente pista"""
-        try:
-            import pyautogui
-            pyautogui.press('nexttrack')
-            # Invalidar la pista actual para forzar una nueva detección
-            self.last_detected_track = None
-            self.track_stable_count = 0
-            return True
-        except:
-            return False
+        _tap(VK_MEDIA_NEXT_TRACK)
+        # La pista se renueva en el hilo de escaneo cuando el título de la ventana cambie
+        self._flush(skipped=True)
+        return True
     
     def previous_track(self) -> bool:
         """Vuelve a la pista anterior"""
-        try:
-            import pyautogui
-            pyautogui.press('prevtrack')
-            # Invalidar la pista actual para forzar una nueva detección
-            self.last_detected_track = None
-            self.track_stable_count = 0
-            return True
-        except:
-            return False
+        _tap(VK_MEDIA_PREV_TRACK)
+        # La pista se renueva en el hilo de escaneo cuando el título de la ventana cambie
+        self._flush(skipped=True)
+        return True
     
-    def seek(self, position_ms: int) -> bool:
-        """No es posible buscar una posición específica con este método"""
-        return False
-    
-    def set_shuffle(self, state: bool) -> bool:
-        """No es posible establecer el estado de reproducción aleatoria con este método"""
-        return False
-    
-    def set_repeat(self, state: bool) -> bool:
-        """No es posible establecer el estado de repetición con este método"""
-        return False
-
     def _get_track_position(self):
         """Obtiene la duración y posición actuales en milisegundos"""
         # Como no podemos obtener esta información directamente, devolvemos valores predeterminados
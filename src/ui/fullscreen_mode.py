@@ -10,10 +10,27 @@ class FullscreenMode:
     def __init__(self, main_window: QMainWindow):
         self.main_window = main_window
     
+    @property
+    def is_enabled(self) -> bool:
+        """Indica si la ventana está en pantalla completa (según el estado que guarda Qt)"""
+        return self.main_window.isFullScreen()
+    
     def enable(self):
         """Activa el modo pantalla completa"""
+        # Evitar el relayout y repintado de volver a aplicar el mismo estado
+        if self.is_enabled:
+            return
         self.main_window.showFullScreen()
     
     def disable(self):
         """Desactiva el modo pantalla completa"""
+        if not self.is_enabled:
+            return
         self.main_window.showNormal()
+    
+    def toggle(self):
+        """Alterna entre pantalla completa y ventana normal"""
+        if self.is_enabled:
+            self.main_window.showNormal()
+        else:
+            self.main_window.showFullScreen()
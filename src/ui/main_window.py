@@ -1,29 +1,150 @@
 import os
 import sys
 import logging
-import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
 from PyQt6.QtWidgets import (QMainWindow, QApplication, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QPushButton, QSlider, QMenu,
-                             QSystemTrayIcon, QMessageBox, QStyle, QScrollArea, QSpacerItem, QSizePolicy, QFrame)
-from PyQt6.QtGui import QIcon, QPixmap, QAction, QPalette, QColor, QFont
-from PyQt6.QtCore import Qt, QTimer, QSize, QUrl, QPoint, QPropertyAnimation, QEasingCurve, QDateTime
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+                             QSystemTrayIcon, QMessageBox, QStyle, QScrollArea, QSpacerItem, QSizePolicy, QFrame,
+                             QGraphicsOpacityEffect)
+from PyQt6.QtGui import QIcon, QPixmap, QImage, QAction, QPalette, QColor, QFont
+from PyQt6.QtCore import (Qt, QTimer, QSize, QUrl, QPoint, QPropertyAnimation, QEasingCurve,
+                          QObject, QRunnable, QThreadPool, pyqtSignal)
+from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply, QNetworkDiskCache
 from PIL import Image
 from io import BytesIO
-from colorthief import ColorThief
+
+# NumPy permite extraer la paleta con operaciones vectorizadas; sin él se recurre a ColorThief
+try:
+    import numpy as np
+except ImportError:
+    np = None
+    from colorthief import ColorThief
 
 from ..player_detection.detector import MusicInfo
 from ..lyrics.lyrics_provider import LyricsData, LyricLine
 from .widget_mode import WidgetMode
 from .styles import Styles
 
+# Lado de la miniatura sobre la que se calcula la paleta (las portadas rara vez superan 640x640)
+_PALETTE_SAMPLE_SIZE = 100
+
+def _extract_palette(image_data: bytes, count: int) -> list:
+    """
+    Devuelve los `count` colores más frecuentes de la imagen como tuplas (r, g, b),
+    agrupando los píxeles de una miniatura en cubos de 5 bits por canal
+    """
+    img = Image.open(BytesIO(image_data))
+    # En JPEG, decodificar directamente a escala reducida
+    img.draft("RGB", (_PALETTE_SAMPLE_SIZE, _PALETTE_SAMPLE_SIZE))
+    img = img.convert("RGB").resize((_PALETTE_SAMPLE_SIZE, _PALETTE_SAMPLE_SIZE), Image.Resampling.BILINEAR)
+    pixels = np.asarray(img, dtype=np.uint8).reshape(-1, 3)
+    
+    # Empaquetar los 5 bits altos de cada canal en un único entero de 15 bits
+    quantized = (pixels >> 3).astype(np.uint16)
+    packed = (quantized[:, 0] << 10) | (quantized[:, 1] << 5) | quantized[:, 2]
+    _, inverse, counts = np.unique(packed, return_inverse=True, return_counts=True)
+    
+    # Los cubos más poblados, representados por el color medio de sus píxeles
+    top = np.argsort(counts)[::-1][:count]
+    sums = np.stack([np.bincount(inverse, weights=pixels[:, c]) for c in range(3)], axis=1)
+    means = np.rint(sums[top] / counts[top, None]).astype(int)
+    palette = [tuple(color) for color in means.tolist()]
+    
+    # Una imagen de un solo color no llena la paleta: repetir el último
+    while len(palette) < count:
+        palette.append(palette[-1])
+    return palette
+
+# Caché HTTP en disco de las portadas (Qt gestiona la validación con el servidor)
+_ARTWORK_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+_shared_network_manager = None
+
+def _get_network_manager(cache_dir: Optional[Path] = None) -> QNetworkAccessManager:
+    """Devuelve el gestor de red compartido por todos los ImageLoader, creándolo la primera vez
+    (con la caché de portadas en cache_dir/artwork si se indica cache_dir)"""
+    global _shared_network_manager
+    if _shared_network_manager is None:
+        # Un único gestor reutiliza las conexiones abiertas con los mismos servidores (CDN de portadas)
+        _shared_network_manager = QNetworkAccessManager(QApplication.instance())
+        if cache_dir is not None:
+            disk_cache = QNetworkDiskCache(_shared_network_manager)
+            disk_cache.setCacheDirectory(str(Path(cache_dir) / "artwork"))
+            disk_cache.setMaximumCacheSize(_ARTWORK_CACHE_MAX_BYTES)
+            _shared_network_manager.setCache(disk_cache)
+    return _shared_network_manager
+
+def _now_ms() -> int:
+    """Milisegundos de un reloj monotónico (solo sirve para medir intervalos)"""
+    return time.monotonic_ns() // 1_000_000
+
+@lru_cache(maxsize=4096)
+def _format_seconds(total_seconds: int) -> str:
+    """Formatea una cantidad de segundos como M:SS"""
+    minutes, seconds = divmod(total_seconds, 60)
+    return f"{minutes}:{seconds:02d}"
+
+# Número de colores de la paleta que se precalcula al decodificar cada portada
+_DEFAULT_PALETTE_SIZE = 2
+
+class _ImageDecodeSignals(QObject):
+    """Señales con las que las tareas de decodificación devuelven su resultado al hilo de la interfaz"""
+    # url, imagen escalada, bytes originales, paleta (o None)
+    decoded = pyqtSignal(str, QImage, object, object)
+
+class _ImageDecodeTask(QRunnable):
+    """
+    Decodifica y escala una portada fuera del hilo de la interfaz (y calcula su paleta
+    si compute_palette, es decir, si los colores de la interfaz salen de la portada)
+    """
+    
+    def __init__(self, url: str, data: bytes, size: QSize, signals: _ImageDecodeSignals,
+                 compute_palette: bool = True):
+        super().__init__()
+        self.url = url
+        self.data = data
+        self.size = size
+        self.signals = signals
+        self.compute_palette = compute_palette
+    
+    def run(self):
+        # A diferencia de QPixmap, QImage puede usarse desde cualquier hilo
+        image = QImage.fromData(self.data)
+        if not image.isNull():
+            image = image.scaled(
+                self.size,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation
+            )
+        
+        palette = None
+        if self.compute_palette and np is not None:
+            try:
+                palette = _extract_palette(self.data, _DEFAULT_PALETTE_SIZE)
+            except Exception as e:
+                logging.debug(f"Error al precalcular la paleta de la portada: {e}")
+        
+        self.signals.decoded.emit(self.url, image, self.data, palette)
+
 class ImageLoader(QLabel):
     """Widget para cargar imágenes desde URL"""
     
-    def __init__(self, parent=None):
+    # Se emite cuando la nueva portada ya se muestra y sus colores están disponibles
+    image_ready = pyqtSignal()
+    
+    # Bytes de las últimas portadas descargadas {url: datos}, compartidos por todas las instancias
+    _url_cache: "OrderedDict[str, bytes]" = OrderedDict()
+    _url_cache_max = 16
+    
+    def __init__(self, parent=None, cache_dir: Optional[Path] = None, precompute_palette: bool = True):
         super().__init__(parent)
-        self.network_manager = QNetworkAccessManager()
-        self.network_manager.finished.connect(self._on_image_loaded)
+        self.network_manager = _get_network_manager(cache_dir)
+        # Sin colores de la portada no se precalcula la paleta; get_dominant_colors la calcula si se pide
+        self.precompute_palette = precompute_palette
         self.default_size = QSize(120, 120)
         self.setMinimumSize(self.default_size)
         self.setMaximumSize(self.default_size)
@@ -31,6 +152,14 @@ class ImageLoader(QLabel):
         self.setStyleSheet("background-color: #333; border-radius: 8px;")
         self.current_url = ""
         self.image_data = None
+        
+        # Paletas ya calculadas {(url, número de colores): paleta}, acotada (LRU)
+        self._palette_cache: "OrderedDict[tuple, list]" = OrderedDict()
+        self._palette_cache_max = 8
+        
+        # Resultados de las tareas de decodificación (llegan al hilo de la interfaz por cola)
+        self._decode_signals = _ImageDecodeSignals(self)
+        self._decode_signals.decoded.connect(self._on_image_decoded)
     
     def load_image_from_url(self, url: str):
         """Carga una imagen desde una URL"""
@@ -38,39 +167,95 @@ class ImageLoader(QLabel):
             return
         
         self.current_url = url
+        
+        # Portadas ya descargadas (p. ej., al volver a una canción anterior) salen de memoria
+        cached = self._url_cache.get(url)
+        if cached is not None:
+            self._url_cache.move_to_end(url)
+            self._show_image_data(cached)
+            return
+        
         request = QNetworkRequest(QUrl(url))
-        self.network_manager.get(request)
+        request.setAttribute(QNetworkRequest.Attribute.HttpPipeliningAllowedAttribute, True)
+        request.setAttribute(QNetworkRequest.Attribute.Http2AllowedAttribute, True)
+        request.setAttribute(
+            QNetworkRequest.Attribute.CacheLoadControlAttribute,
+            QNetworkRequest.CacheLoadControl.PreferCache
+        )
+        
+        # El gestor es compartido: cada instancia atiende solo sus propias respuestas
+        reply = self.network_manager.get(request)
+        reply.finished.connect(lambda: self._on_image_loaded(reply, url))
     
-    def _on_image_loaded(self, reply: QNetworkReply):
+    def _on_image_loaded(self, reply: QNetworkReply, url: str):
         """Maneja la respuesta de la solicitud de imagen"""
+        reply.deleteLater()
+        
         if reply.error() != QNetworkReply.NetworkError.NoError:
             logging.error(f"Error al cargar imagen: {reply.errorString()}")
             return
         
-        data = reply.readAll()
-        self.image_data = data.data()
+        data = reply.readAll().data()
         
-        pixmap = QPixmap()
-        pixmap.loadFromData(data)
+        ImageLoader._url_cache[url] = data
+        if len(ImageLoader._url_cache) > ImageLoader._url_cache_max:
+            ImageLoader._url_cache.popitem(last=False)
+        
+        # Una respuesta que llega después de cambiar de portada solo se guarda en la caché
+        if url != self.current_url:
+            return
         
-        # Redimensionar manteniendo la proporción
-        scaled_pixmap = pixmap.scaled(
-            self.default_size, 
-            Qt.AspectRatioMode.KeepAspectRatio, 
-            Qt.TransformationMode.SmoothTransformation
+        self._show_image_data(data)
+    
+    def _show_image_data(self, data: bytes):
+        """Muestra la imagen a partir de sus bytes, decodificándola en un hilo del pool"""
+        task = _ImageDecodeTask(
+            self.current_url, data, self.default_size, self._decode_signals, self.precompute_palette
         )
+        QThreadPool.globalInstance().start(task)
+    
+    def _on_image_decoded(self, url: str, image: QImage, data: bytes, palette):
+        """Muestra la portada ya decodificada y escalada"""
+        # Descartar resultados de una portada que ya no es la actual
+        if url != self.current_url:
+            return
+        
+        self.image_data = data
+        if palette is not None:
+            self._remember_palette((url, _DEFAULT_PALETTE_SIZE), palette)
         
-        self.setPixmap(scaled_pixmap)
+        # Convertir a QPixmap es barato: la imagen ya tiene el tamaño final
+        self.setPixmap(QPixmap.fromImage(image))
+        self.image_ready.emit()
     
-    def get_dominant_colors(self, count=2):
+    def _remember_palette(self, cache_key: tuple, palette: list):
+        """Guarda una paleta en la caché, descartando la menos usada si se llena"""
+        self._palette_cache[cache_key] = palette
+        if len(self._palette_cache) > self._palette_cache_max:
+            self._palette_cache.popitem(last=False)
+    
+    def get_dominant_colors(self, count=_DEFAULT_PALETTE_SIZE):
         """Obtiene los colores dominantes de la imagen cargada"""
         if not self.image_data:
             return None
         
+        # La cuantización es lo costoso: calcularla una sola vez por portada
+        cache_key = (self.current_url, count)
+        palette = self._palette_cache.get(cache_key)
+        if palette is not None:
+            self._palette_cache.move_to_end(cache_key)
+            return palette
+        
         try:
-            img = Image.open(BytesIO(self.image_data))
-            color_thief = ColorThief(BytesIO(self.image_data))
-            palette = color_thief.get_palette(color_count=count, quality=5)
+            if np is not None:
+                palette = _extract_palette(self.image_data, count)
+            else:
+                color_thief = ColorThief(BytesIO(self.image_data))
+                palette = color_thief.get_palette(color_count=count, quality=5)
+            
+            # Sin URL no hay forma de identificar la imagen, así que no se guarda
+            if self.current_url:
+                self._remember_palette(cache_key, palette)
             return palette
         except Exception as e:
             logging.error(f"Error al obtener colores dominantes: {e}")
@@ -79,6 +264,9 @@ class ImageLoader(QLabel):
 class MainWindow(QMainWindow):
     """Ventana principal del widget de música"""
     
+    # Resultado de una búsqueda de letras en segundo plano: clave de la canción y Future
+    _lyrics_ready = pyqtSignal(str, object)
+    
     def __init__(self, config, music_manager, lyrics_manager):
         super().__init__()
         
@@ -95,6 +283,9 @@ class MainWindow(QMainWindow):
         self.last_track_info = None  # Variable para almacenar la última información de pista válida
         self.paused_manually = False  # Nueva variable para indicar si la pausa fue manual
         
+        # Las búsquedas de letras terminan en otro hilo; la señal las trae al hilo de la interfaz
+        self._lyrics_ready.connect(self._on_lyrics_ready)
+        
         # Configurar la ventana completamente transparente
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.Tool)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
@@ -106,7 +297,8 @@ class MainWindow(QMainWindow):
         
         # Widget central
         self.central_widget = QWidget()
-        self.central_widget.setStyleSheet("background-color: transparent;")
+        # Estilos de todos los elementos en una sola hoja, analizada una única vez
+        self.central_widget.setStyleSheet(Styles.get_widget_style())
         self.setCentralWidget(self.central_widget)
         
         # Layout principal con márgenes reducidos para más espacio
@@ -116,9 +308,6 @@ class MainWindow(QMainWindow):
         
         # Variables para efectos
         self.controls_visible = False
-        self.controls_animation_timer = QTimer(self)
-        self.controls_animation_timer.timeout.connect(self._update_controls_animation)
-        self.controls_opacity = 0.0
         
         # Inicializar el modo widget
         self.widget_mode = WidgetMode(self)
@@ -136,7 +325,10 @@ class MainWindow(QMainWindow):
         # Temporizador para actualización de progreso (tiempo, barra) - más frecuente
         self.update_progress_timer = QTimer(self)
         self.update_progress_timer.timeout.connect(self._update_progress_info)
-        self.update_progress_timer.start(100)  # Actualizar cada 100ms para suavidad visual
+        self.update_progress_timer.start(250)  # Cada 250 ms: la barra avanza pocos píxeles por segundo
+        
+        # Si se omitieron actualizaciones con la ventana oculta, refrescar todo al mostrarla
+        self._refresh_on_show = False
         
         # Banderas
         self.is_widget_mode = True  # Siempre en modo widget
@@ -164,7 +356,6 @@ class MainWindow(QMainWindow):
         self.lyrics_widget = QWidget()
         self.lyrics_widget.setFixedWidth(600)  # Ancho fijo para las letras
         self.lyrics_widget.setFixedHeight(400)  # Altura fija para las letras
-        self.lyrics_widget.setStyleSheet("background-color: transparent;")
         self.lyrics_layout = QVBoxLayout(self.lyrics_widget)
         self.lyrics_layout.setContentsMargins(0, 0, 0, 0)
         self.lyrics_layout.setSpacing(0)
@@ -176,32 +367,10 @@ class MainWindow(QMainWindow):
         self.lyrics_scroll_area.setFrameShape(QFrame.Shape.NoFrame)
         self.lyrics_scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         self.lyrics_scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.lyrics_scroll_area.setStyleSheet("""
-            QScrollArea {
-                background: transparent; 
-                border: none;
-            }
-            QScrollArea > QWidget > QWidget {
-                background: transparent;
-            }
-            QScrollBar:vertical {
-                background: rgba(0, 0, 0, 0.2);
-                width: 8px;
-                margin: 0px;
-            }
-            QScrollBar::handle:vertical {
-                background: rgba(255, 255, 255, 0.3);
-                min-height: 20px;
-                border-radius: 4px;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-        """)
+        self.lyrics_scroll_area.setObjectName("LyricsScrollArea")
         
         # Crear contenedor para las letras
         self.lyrics_container = QWidget()
-        self.lyrics_container.setStyleSheet("background-color: transparent;")
         self.lyrics_container_layout = QVBoxLayout(self.lyrics_container)
         self.lyrics_container_layout.setContentsMargins(0, 0, 0, 0)
         self.lyrics_container_layout.setSpacing(24)  # Más espacio entre líneas para mejor legibilidad
@@ -223,16 +392,8 @@ class MainWindow(QMainWindow):
         self.lyrics_widget.enterEvent = self._on_lyrics_enter
         self.lyrics_widget.leaveEvent = self._on_lyrics_leave
         
-        # Añadir un efecto de difuminado en los bordes superior e inferior
-        self.lyrics_widget.setStyleSheet("""
-            QWidget {
-                background-color: transparent;
-            }
-        """)
-        
         # Barra de título minimalista (solo para arrastrar)
         self.title_bar = QWidget()
-        self.title_bar.setStyleSheet("background-color: transparent;")
         self.title_bar.setFixedHeight(30)
         self.title_bar.setCursor(Qt.CursorShape.SizeAllCursor)  # Cursor de mover
         
@@ -246,45 +407,13 @@ class MainWindow(QMainWindow):
         
         # Botón de cierre
         self.close_button = QPushButton("✕")
-        self.close_button.setStyleSheet("""
-            QPushButton {
-                background-color: rgba(180, 20, 20, 0.7);
-                color: #ffffff;
-                font-size: 12px;
-                border: none;
-                border-radius: 10px;
-                padding: 2px;
-                min-width: 20px;
-                max-width: 20px;
-                min-height: 20px;
-                max-height: 20px;
-            }
-            QPushButton:hover {
-                background-color: rgba(220, 0, 0, 0.9);
-            }
-        """)
+        self.close_button.setObjectName("TitleCloseButton")
         self.close_button.setToolTip("Cerrar")
         self.close_button.clicked.connect(self._exit_application)
         
         # Botón para minimizar a la bandeja
         self.tray_button = QPushButton("_")
-        self.tray_button.setStyleSheet("""
-            QPushButton {
-                background-color: rgba(50, 50, 50, 0.7);
-                color: #cccccc;
-                font-size: 12px;
-                border: none;
-                border-radius: 10px;
-                padding: 2px;
-                min-width: 20px;
-                max-width: 20px;
-                min-height: 20px;
-                max-height: 20px;
-            }
-            QPushButton:hover {
-                background-color: rgba(70, 70, 70, 0.9);
-            }
-        """)
+        self.tray_button.setObjectName("TitleTrayButton")
         self.tray_button.setToolTip("Minimizar")
         self.tray_button.clicked.connect(self.hide)
         
@@ -297,29 +426,31 @@ class MainWindow(QMainWindow):
         self.title_bar_layout.addStretch()
         self.title_bar_layout.addLayout(self.control_buttons_layout)
         
-        # Hacer botones transparentes inicialmente
-        self.close_button.setStyleSheet(self.close_button.styleSheet() + "background-color: rgba(180, 20, 20, 0.0);")
-        self.tray_button.setStyleSheet(self.tray_button.styleSheet() + "background-color: rgba(50, 50, 50, 0.0);")
+        # Los botones son transparentes hasta que el ratón entra en la ventana
+        self._set_title_buttons_revealed(False)
         
         # Panel de control y reproducción (parte inferior)
         self.player_widget = QWidget()
-        self.player_widget.setStyleSheet("background-color: transparent;")
         self.player_layout = QVBoxLayout(self.player_widget)
         self.player_layout.setContentsMargins(0, 10, 0, 0)
         self.player_layout.setSpacing(10)
         
         # Info de la canción (minimizada)
         self.song_info_widget = QWidget()
-        self.song_info_widget.setStyleSheet("background-color: transparent;")
         self.song_info_layout = QHBoxLayout(self.song_info_widget)
         self.song_info_layout.setContentsMargins(10, 5, 10, 5)
         self.song_info_layout.setSpacing(10)
         
         # Portada del álbum (pequeña)
-        self.album_art = ImageLoader(self)
+        self.album_art = ImageLoader(
+            self,
+            cache_dir=self.config.cache_dir,
+            precompute_palette=self.config.get("appearance", "colors_from_artwork", True)
+        )
         self.album_art.setMinimumSize(QSize(60, 60))
         self.album_art.setMaximumSize(QSize(60, 60))
         self.album_art.setStyleSheet("background-color: transparent; border-radius: 5px;")
+        self.album_art.image_ready.connect(self._on_album_art_ready)
         
         # Información de texto
         self.text_info_layout = QVBoxLayout()
@@ -329,17 +460,17 @@ class MainWindow(QMainWindow):
         # Título de la canción
         self.title_label = QLabel("No hay música reproduciéndose")
         self.title_label.setWordWrap(True)
-        self.title_label.setStyleSheet("color: white; font-size: 14px; font-weight: bold; background-color: transparent;")
+        self.title_label.setObjectName("TitleLabel")
         
         # Artista
         self.artist_label = QLabel("")
         self.artist_label.setWordWrap(True)
-        self.artist_label.setStyleSheet("color: #ddd; font-size: 12px; background-color: transparent;")
+        self.artist_label.setObjectName("ArtistLabel")
         
         # Álbum (opcional)
         self.album_label = QLabel("")
         self.album_label.setWordWrap(True)
-        self.album_label.setStyleSheet("color: #bbb; font-size: 10px; background-color: transparent;")
+        self.album_label.setObjectName("AlbumLabel")
         
         # Añadir información de texto
         self.text_info_layout.addWidget(self.title_label)
@@ -358,33 +489,19 @@ class MainWindow(QMainWindow):
         
         # Tiempo actual
         self.time_current_label = QLabel("0:00")
-        self.time_current_label.setStyleSheet("color: #fff; font-size: 10px; background-color: transparent;")
+        self._last_current_str = "0:00"
+        self.time_current_label.setObjectName("TimeLabel")
         
         # Slider
         self.progress_slider = QSlider(Qt.Orientation.Horizontal)
-        self.progress_slider.setStyleSheet("""
-            QSlider::groove:horizontal {
-                height: 3px;
-                background: rgba(255, 255, 255, 0.2);
-                border-radius: 2px;
-            }
-            QSlider::handle:horizontal {
-                width: 8px;
-                margin: -3px 0;
-                border-radius: 4px;
-                background: white;
-            }
-            QSlider::sub-page:horizontal {
-                background: white;
-                border-radius: 2px;
-            }
-        """)
+        self.progress_slider.setObjectName("ProgressSlider")
         self.progress_slider.sliderMoved.connect(self._on_slider_moved)
         self.progress_slider.sliderReleased.connect(self._on_slider_released)
         
         # Tiempo total
         self.time_total_label = QLabel("0:00")
-        self.time_total_label.setStyleSheet("color: #fff; font-size: 10px; background-color: transparent;")
+        self._last_total_str = "0:00"
+        self.time_total_label.setObjectName("TimeLabel")
         
         # Añadir al layout de progreso
         self.progress_layout.addWidget(self.time_current_label)
@@ -393,48 +510,30 @@ class MainWindow(QMainWindow):
         
         # Contenedor para controles de reproducción (inicialmente transparente)
         self.controls_container = QWidget()
-        self.controls_container.setStyleSheet("background-color: transparent;")
         
         # Controles de reproducción
         self.controls_layout = QHBoxLayout(self.controls_container)
         self.controls_layout.setContentsMargins(0, 0, 0, 0)
         self.controls_layout.setSpacing(15)
         
-        # Estilo común para los botones de control
-        button_style = """
-            QPushButton {
-                font-size: 16px; 
-                color: white; 
-                background-color: rgba(0, 0, 0, 0.3);
-                border-radius: 12px;
-                min-width: 25px;
-                max-width: 25px;
-                min-height: 25px;
-                max-height: 25px;
-            }
-            QPushButton:hover {
-                background-color: rgba(255, 255, 255, 0.2);
-            }
-        """
-        
         self.shuffle_button = QPushButton("🔀")
-        self.shuffle_button.setStyleSheet(button_style)
+        self.shuffle_button.setObjectName("ControlButton")
         self.shuffle_button.clicked.connect(self._on_shuffle_clicked)
         
         self.prev_button = QPushButton("⏮")
-        self.prev_button.setStyleSheet(button_style)
+        self.prev_button.setObjectName("ControlButton")
         self.prev_button.clicked.connect(self._on_prev_clicked)
         
         self.play_pause_button = QPushButton("▶")
-        self.play_pause_button.setStyleSheet(button_style)
+        self.play_pause_button.setObjectName("ControlButton")
         self.play_pause_button.clicked.connect(self._on_play_pause_clicked)
         
         self.next_button = QPushButton("⏭")
-        self.next_button.setStyleSheet(button_style)
+        self.next_button.setObjectName("ControlButton")
         self.next_button.clicked.connect(self._on_next_clicked)
         
         self.repeat_button = QPushButton("🔁")
-        self.repeat_button.setStyleSheet(button_style)
+        self.repeat_button.setObjectName("ControlButton")
         self.repeat_button.clicked.connect(self._on_repeat_clicked)
         
         # Añadir botones al layout
@@ -446,8 +545,13 @@ class MainWindow(QMainWindow):
         self.controls_layout.addWidget(self.repeat_button)
         self.controls_layout.addStretch()
         
-        # Los controles inicialmente estarán ocultos
-        self.controls_container.setStyleSheet("background-color: transparent; opacity: 0;")
+        # Los controles inicialmente estarán ocultos; el fundido lo compone Qt con un efecto de opacidad
+        self._controls_fx = QGraphicsOpacityEffect(self.controls_container)
+        self._controls_fx.setOpacity(0.0)
+        self.controls_container.setGraphicsEffect(self._controls_fx)
+        self._controls_anim = QPropertyAnimation(self._controls_fx, b"opacity", self)
+        self._controls_anim.setDuration(200)
+        self._controls_anim.setEasingCurve(QEasingCurve.Type.OutCubic)
         
         # Añadir todo al layout del reproductor
         self.player_layout.addWidget(self.song_info_widget)
@@ -468,6 +572,13 @@ class MainWindow(QMainWindow):
     def _update_track_info(self):
         """Actualiza la información de la pista en reproducción (no el progreso)"""
         try:
+            # Con la ventana oculta en la bandeja solo se mantiene al día el detector;
+            # la interfaz se actualiza de una vez al volver a mostrarla (showEvent)
+            if not self.isVisible():
+                self.music_manager.update()
+                self._refresh_on_show = True
+                return
+            
             # Si estamos en pausa manual, simplemente mantener la información actual
             if self.paused_manually and (self.current_track or self.last_track_info):
                 logging.debug("Pausa manual activa, manteniendo información actual")
@@ -492,18 +603,19 @@ class MainWindow(QMainWindow):
                     self.is_paused = True
                     
                     # Si no tenemos información guardada pero sí track actual
-                    if not self.last_track_info and self.current_track:
+                    current = self.current_track
+                    if not self.last_track_info and current:
                         # Guardar una copia completa del track actual
                         track_copy = MusicInfo(
-                            title=self.current_track.title,
-                            artist=self.current_track.artist,
-                            album=self.current_track.album,
-                            album_art_url=self.current_track.album_art_url,
-                            duration_ms=self.current_track.duration_ms,
-                            position_ms=self.current_track.position_ms,
+                            title=current.title,
+                            artist=current.artist,
+                            album=current.album,
+                            album_art_url=current.album_art_url,
+                            duration_ms=current.duration_ms,
+                            position_ms=current.position_ms,
                             is_playing=False,
-                            player_name=self.current_track.player_name,
-                            track_id=self.current_track.track_id
+                            player_name=current.player_name,
+                            track_id=current.track_id
                         )
                         self.last_track_info = track_copy
                         logging.info(f"Se guardó información de pista pausada automáticamente: {self.last_track_info.title}")
@@ -565,14 +677,14 @@ class MainWindow(QMainWindow):
             # Establecer los límites del slider y duración total si es una pista nueva
             if is_new_track and track_info.duration_ms > 0:
                 self.progress_slider.setMaximum(track_info.duration_ms)
-                self.time_total_label.setText(self._format_time(track_info.duration_ms))
+                self._set_total_time_text(self._format_time(track_info.duration_ms))
             elif track_info.duration_ms <= 0:
                 self.progress_slider.setMaximum(100)
-                self.time_total_label.setText("0:00")
+                self._set_total_time_text("0:00")
             
             # Inicializar o actualizar la posición para el sistema de estimación
             self.last_position_ms = track_info.position_ms
-            self.last_position_update = QDateTime.currentMSecsSinceEpoch()
+            self.last_position_update = _now_ms()
             
             # Solo actualizar etiquetas si es una pista nueva
             if is_new_track:
@@ -599,6 +711,7 @@ class MainWindow(QMainWindow):
                     self.artist_label.setText("Artista desconocido")
                 
                 # Cargar imagen del álbum si está disponible
+                # (los colores se actualizan en _on_album_art_ready, cuando la portada ya está decodificada)
                 if track_info.album_art_url:
                     self.album_art.load_image_from_url(track_info.album_art_url)
                 else:
@@ -610,10 +723,6 @@ class MainWindow(QMainWindow):
                     # Limpiar letras antiguas y cargar las nuevas
                     self._clear_lyrics()
                     self._load_lyrics(track_info.title, track_info.artist)
-                    
-                # Actualizar colores si está configurado
-                if self.config.get("appearance", "colors_from_artwork", True):
-                    self._update_colors_from_artwork()
             else:
                 # Simplemente actualizar el estado de la pista sin recargar todo
                 # Pero preservar el estado de reproducción actual
@@ -645,8 +754,8 @@ class MainWindow(QMainWindow):
         self.album_label.setText("")
         self.play_pause_button.setText("▶")
         self.progress_slider.setValue(0)
-        self.time_current_label.setText("0:00")
-        self.time_total_label.setText("0:00")
+        self._set_current_time_text("0:00")
+        self._set_total_time_text("0:00")
         self._clear_lyrics()
     
     def _load_lyrics(self, track_name=None, artist_name=None):
@@ -701,15 +810,39 @@ class MainWindow(QMainWindow):
                 padding: 20px;
             """)
             self.lyrics_container_layout.addWidget(loading_label)
-            QApplication.processEvents()  # Actualizar la interfaz inmediatamente
             
-            # Obtener las letras usando el LyricsManager
-            lyrics_data = None
-            if hasattr(self, 'lyrics_manager') and self.lyrics_manager:
-                lyrics_data = self.lyrics_manager.get_lyrics(track_name, artist_name)
+            # Buscar las letras en segundo plano para no bloquear la interfaz
+            if not self.lyrics_manager:
+                self._show_lyrics(current_song_key, None)
+                return
             
-            # Limpiar el indicador de carga
+            future = self.lyrics_manager.get_lyrics_async(track_name, artist_name)
+            future.add_done_callback(lambda f: self._lyrics_ready.emit(current_song_key, f))
+        
+        except Exception as e:
+            logging.error(f"Error al cargar letras: {str(e)}", exc_info=True)
+            self.lyrics_loading = False
+    
+    def _on_lyrics_ready(self, song_key: str, future):
+        """Recibe en el hilo de la interfaz el resultado de una búsqueda de letras"""
+        # Descartar resultados de una canción que ya no es la actual
+        if getattr(self, 'current_lyrics_song_key', None) != song_key or not self.lyrics_loading:
+            return
+        
+        try:
+            lyrics_data = future.result()
+        except Exception as e:
+            logging.error(f"Error al obtener letras: {str(e)}", exc_info=True)
+            lyrics_data = None
+        
+        self._show_lyrics(song_key, lyrics_data)
+    
+    def _show_lyrics(self, song_key: str, lyrics_data):
+        """Sustituye el indicador de carga por las letras encontradas (o por un aviso)"""
+        try:
+            # Limpiar el indicador de carga (conservando la clave de la canción cargada)
             self._clear_lyrics()
+            self.current_lyrics_song_key = song_key
             
             # Extraer el texto de las letras
             lyrics_text = lyrics_data.lyrics_text if lyrics_data else None
@@ -733,97 +866,14 @@ class MainWindow(QMainWindow):
                 self.lyrics_loading = False
                 return
             
-            # Añadir información del proveedor de letras en la parte superior
-            if lyrics_data and hasattr(lyrics_data, 'source') and lyrics_data.source:
-                source_label = QLabel(f"Proveedor: {lyrics_data.source}")
-                source_label.setAlignment(Qt.AlignmentFlag.AlignRight)
-                source_label.setStyleSheet("""
-                    color: rgba(255, 255, 255, 0.5);
-                    font-size: 12px;
-                    font-style: italic;
-                    background: transparent;
-                    padding: 4px 8px;
-                """)
-                self.lyrics_container_layout.addWidget(source_label)
-            
-            # Preparar las letras sincronizadas o normales
-            self.lyrics_widgets = []
-            self.lyrics_times = []
-            
-            if has_synced_lyrics and lyrics_data.lines:
-                self.current_lyrics = lyrics_data.lines
-                
-                # Crear un widget para cada línea de letras
-                for i, lyric_line in enumerate(lyrics_data.lines):
-                    line_widget = QLabel(lyric_line.text if lyric_line.text else " ")
-                    line_widget.setWordWrap(True)  # Permitir envolver el texto
-                    line_widget.setFixedWidth(580)  # Ancho fijo para evitar desplazamiento horizontal
-                    line_widget.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                    line_widget.setStyleSheet("""
-                        color: rgba(255, 255, 255, 0.4);
-                        font-size: 16px;
-                        background: transparent;
-                        padding: 4px 10px;
-                    """)
-                    
-                    self.lyrics_container_layout.addWidget(line_widget)
-                    self.lyrics_widgets.append(line_widget)
-                    self.lyrics_times.append(lyric_line.start_time_ms)
-                    
-                    # Actualizar la interfaz de forma intermitente para mayor fluidez
-                    if i % 10 == 0:
-                        QApplication.processEvents()
-            else:
-                # Letras no sincronizadas - mostrar como texto normal
-                self.current_lyrics = None
-                
-                # Si el texto de letras es una cadena, dividirlo en líneas
-                if isinstance(lyrics_text, str):
-                    lyrics_lines = lyrics_text.split('\n')
-                else:
-                    lyrics_lines = lyrics_text
-                
-                # Crear un widget para cada línea de letras
-                for i, line in enumerate(lyrics_lines):
-                    if not line.strip():  # Mantener líneas vacías para espaciado
-                        line = " "
-                        
-                    line_widget = QLabel(line)
-                    line_widget.setWordWrap(True)  # Permitir envolver el texto
-                    line_widget.setFixedWidth(580)  # Ancho fijo para evitar desplazamiento horizontal
-                    line_widget.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                    line_widget.setStyleSheet("""
-                        color: rgba(255, 255, 255, 0.7);
-                        font-size: 16px;
-                        background: transparent;
-                        padding: 4px 10px;
-                    """)
-                    
-                    self.lyrics_container_layout.addWidget(line_widget)
-                    self.lyrics_widgets.append(line_widget)
-                    self.lyrics_times.append(0)  # No hay tiempo para letras no sincronizadas
-                    
-                    # Actualizar la interfaz de forma intermitente para mayor fluidez
-                    if i % 10 == 0:
-                        QApplication.processEvents()
-                
-                # Seleccionar la primera línea como actual para letras no sincronizadas
-                if self.lyrics_widgets:
-                    self.lyrics_widgets[0].setStyleSheet("""
-                        color: rgba(255, 255, 255, 1.0);
-                        font-size: 18px;
-                        font-weight: bold;
-                        background: transparent;
-                        padding: 4px 10px;
-                    """)
-                
-                self.current_line_index = 0
-            
-            # Añadir un espacio al final para permitir desplazamiento completo
-            spacer = QWidget()
-            spacer.setMinimumHeight(150)
-            spacer.setStyleSheet("background: transparent;")
-            self.lyrics_container_layout.addWidget(spacer)
+            # Construir todas las líneas sin repintar entre medias: un único repintado al terminar
+            self.lyrics_container.setUpdatesEnabled(False)
+            self.lyrics_scroll_area.setUpdatesEnabled(False)
+            try:
+                self._populate_lyrics(lyrics_data, lyrics_text, has_synced_lyrics)
+            finally:
+                self.lyrics_container.setUpdatesEnabled(True)
+                self.lyrics_scroll_area.setUpdatesEnabled(True)
             
             self.lyrics_loaded = True
             
@@ -835,9 +885,88 @@ class MainWindow(QMainWindow):
             self.lyrics_loading = False
         
         except Exception as e:
-            logging.error(f"Error al cargar letras: {str(e)}", exc_info=True)
+            logging.error(f"Error al mostrar letras: {str(e)}", exc_info=True)
             self.lyrics_loading = False
     
+    def _populate_lyrics(self, lyrics_data, lyrics_text, has_synced_lyrics):
+        """Crea los widgets de las líneas de letras en el contenedor"""
+        # Añadir información del proveedor de letras en la parte superior
+        if lyrics_data and hasattr(lyrics_data, 'source') and lyrics_data.source:
+            source_label = QLabel(f"Proveedor: {lyrics_data.source}")
+            source_label.setAlignment(Qt.AlignmentFlag.AlignRight)
+            source_label.setStyleSheet("""
+                color: rgba(255, 255, 255, 0.5);
+                font-size: 12px;
+                font-style: italic;
+                background: transparent;
+                padding: 4px 8px;
+            """)
+            self.lyrics_container_layout.addWidget(source_label)
+        
+        # Preparar las letras sincronizadas o normales
+        font = QFont(self.lyrics_container.font())
+        font.setPixelSize(16)
+        self.lyrics_widgets = []
+        self.lyrics_times = []
+        
+        if has_synced_lyrics and lyrics_data.lines:
+            self.current_lyrics = lyrics_data.lines
+            
+            # Crear un widget para cada línea de letras
+            for lyric_line in lyrics_data.lines:
+                line_widget = self._create_lyric_label(lyric_line.text if lyric_line.text else " ", "LyricLine", font)
+                
+                self.lyrics_container_layout.addWidget(line_widget)
+                self.lyrics_widgets.append(line_widget)
+                self.lyrics_times.append(lyric_line.start_time_ms)
+        else:
+            # Letras no sincronizadas - mostrar como texto normal
+            self.current_lyrics = None
+            
+            # Si el texto de letras es una cadena, dividirlo en líneas
+            if isinstance(lyrics_text, str):
+                lyrics_lines = lyrics_text.split('\n')
+            else:
+                lyrics_lines = lyrics_text
+            
+            # Crear un widget para cada línea de letras
+            for line in lyrics_lines:
+                if not line.strip():  # Mantener líneas vacías para espaciado
+                    line = " "
+                    
+                line_widget = self._create_lyric_label(line, "PlainLyricLine", font)
+                
+                self.lyrics_container_layout.addWidget(line_widget)
+                self.lyrics_widgets.append(line_widget)
+                self.lyrics_times.append(0)  # No hay tiempo para letras no sincronizadas
+            
+            # Seleccionar la primera línea como actual para letras no sincronizadas
+            if self.lyrics_widgets:
+                self.lyrics_widgets[0].setStyleSheet("""
+                    color: rgba(255, 255, 255, 1.0);
+                    font-size: 18px;
+                    font-weight: bold;
+                    background: transparent;
+                    padding: 4px 10px;
+                """)
+            
+            self.current_line_index = 0
+        
+        # Añadir un espacio al final para permitir desplazamiento completo
+        spacer = QWidget()
+        spacer.setMinimumHeight(150)
+        self.lyrics_container_layout.addWidget(spacer)
+    
+    def _create_lyric_label(self, text: str, object_name: str, font: QFont) -> QLabel:
+        """Crea la etiqueta de una línea de letras (color y márgenes salen de la hoja de estilos)"""
+        label = QLabel(text)
+        label.setObjectName(object_name)
+        label.setFont(font)
+        label.setWordWrap(True)  # Permitir envolver el texto
+        label.setFixedWidth(580)  # Ancho fijo para evitar desplazamiento horizontal
+        label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        return label
+    
     def _clear_lyrics(self):
         """Limpia el área de letras"""
         try:
@@ -997,6 +1126,11 @@ class MainWindow(QMainWindow):
             logging.debug(f"Error al actualizar línea de letras: {e}")
             # No es crítico, solo registramos en debug
     
+    def _on_album_art_ready(self):
+        """Actualiza los colores una vez que la nueva portada está cargada"""
+        if self.config.get("appearance", "colors_from_artwork", True):
+            self._update_colors_from_artwork()
+    
     def _update_colors_from_artwork(self):
         """Actualiza los colores de la interfaz basados en la portada del álbum"""
         colors = self.album_art.get_dominant_colors(count=2)
@@ -1036,7 +1170,7 @@ class MainWindow(QMainWindow):
     
     def _on_slider_moved(self, position):
         """Evento al mover el slider"""
-        self.time_current_label.setText(self._format_time(position))
+        self._set_current_time_text(self._format_time(position))
     
     def _on_slider_released(self):
         """Evento al soltar el slider"""
@@ -1099,7 +1233,7 @@ class MainWindow(QMainWindow):
             
             # Actualizar la última posición conocida para evitar saltos en la visualización
             if hasattr(self, 'last_position_ms'):
-                self.last_position_update = QDateTime.currentMSecsSinceEpoch()
+                self.last_position_update = _now_ms()
             
             # Actualizar la línea actual de las letras inmediatamente cuando se reanuda la reproducción
             if hasattr(self, 'current_lyrics') and self.current_lyrics and hasattr(self, 'lyrics_widgets'):
@@ -1228,10 +1362,19 @@ class MainWindow(QMainWindow):
     
     def _format_time(self, ms: int) -> str:
         """Formatea el tiempo en milisegundos a formato MM:SS"""
-        total_seconds = int(ms / 1000)
-        minutes = total_seconds // 60
-        seconds = total_seconds % 60
-        return f"{minutes}:{seconds:02d}"
+        return _format_seconds(int(ms / 1000))
+    
+    def _set_current_time_text(self, text: str):
+        """Actualiza la etiqueta del tiempo actual solo si cambia el texto (evita repintados)"""
+        if text != self._last_current_str:
+            self._last_current_str = text
+            self.time_current_label.setText(text)
+    
+    def _set_total_time_text(self, text: str):
+        """Actualiza la etiqueta de la duración total solo si cambia el texto"""
+        if text != self._last_total_str:
+            self._last_total_str = text
+            self.time_total_label.setText(text)
     
     def _on_mouse_press(self, event):
         """Maneja el evento de clic del ratón para arrastrar la ventana"""
@@ -1247,43 +1390,34 @@ class MainWindow(QMainWindow):
         """Evento cuando el mouse entra en el widget"""
         # Mostrar los controles
         self.controls_visible = True
-        self.controls_animation_timer.start(50)  # Iniciar animación
+        self._fade_controls(1.0)
         
         # Mostrar botones de la barra de título
-        self.close_button.setStyleSheet(self.close_button.styleSheet().replace("rgba(180, 20, 20, 0.0)", "rgba(180, 20, 20, 0.7)"))
-        self.tray_button.setStyleSheet(self.tray_button.styleSheet().replace("rgba(50, 50, 50, 0.0)", "rgba(50, 50, 50, 0.7)"))
+        self._set_title_buttons_revealed(True)
     
     def _on_mouse_leave(self, event):
         """Evento cuando el mouse sale del widget"""
         # Ocultar los controles
         self.controls_visible = False
-        self.controls_animation_timer.start(50)  # Iniciar animación
+        self._fade_controls(0.0)
         
         # Ocultar botones de la barra de título
-        self.close_button.setStyleSheet(self.close_button.styleSheet().replace("rgba(180, 20, 20, 0.7)", "rgba(180, 20, 20, 0.0)"))
-        self.tray_button.setStyleSheet(self.tray_button.styleSheet().replace("rgba(50, 50, 50, 0.7)", "rgba(50, 50, 50, 0.0)"))
+        self._set_title_buttons_revealed(False)
     
-    def _update_controls_animation(self):
-        """Actualiza la animación de los controles"""
-        if self.controls_visible:
-            # Mostrar gradualmente
-            self.controls_opacity += 0.1
-            if self.controls_opacity >= 1.0:
-                self.controls_opacity = 1.0
-                self.controls_animation_timer.stop()
-        else:
-            # Ocultar gradualmente
-            self.controls_opacity -= 0.1
-            if self.controls_opacity <= 0.0:
-                self.controls_opacity = 0.0
-                self.controls_animation_timer.stop()
-        
-        # Aplicar opacidad a los controles
-        opacity_str = str(self.controls_opacity)
-        self.controls_container.setStyleSheet(f"background-color: transparent; opacity: {opacity_str};")
-        
-        # Forzar actualización visual
-        self.controls_container.update()
+    def _set_title_buttons_revealed(self, revealed: bool):
+        """Muestra u oculta el fondo de los botones de la barra de título"""
+        # La hoja de estilos ya contempla ambos estados: basta con cambiar la propiedad y repulir
+        for button in (self.close_button, self.tray_button):
+            button.setProperty("revealed", revealed)
+            button.style().unpolish(button)
+            button.style().polish(button)
+    
+    def _fade_controls(self, target: float):
+        """Anima la opacidad de los controles desde su valor actual hasta `target`"""
+        self._controls_anim.stop()
+        self._controls_anim.setStartValue(self._controls_fx.opacity())
+        self._controls_anim.setEndValue(target)
+        self._controls_anim.start()
     
     def _init_systray(self):
         """Inicializa el icono en la bandeja del sistema"""
@@ -1342,6 +1476,21 @@ class MainWindow(QMainWindow):
                 self.show()
                 self.activateWindow()
     
+    def showEvent(self, event):
+        """Evento al mostrar la ventana: reanuda el progreso y recupera lo omitido mientras estaba oculta"""
+        super().showEvent(event)
+        if not self.update_progress_timer.isActive():
+            self.update_progress_timer.start(250)
+        
+        if self._refresh_on_show:
+            self._refresh_on_show = False
+            QTimer.singleShot(0, self._update_track_info)
+    
+    def hideEvent(self, event):
+        """Evento al ocultar la ventana: detiene el temporizador de progreso, que no tiene nada que pintar"""
+        super().hideEvent(event)
+        self.update_progress_timer.stop()
+    
     def closeEvent(self, event):
         """Evento al cerrar la ventana"""
         # Cuando se cierra la ventana, minimizar a la bandeja del sistema
@@ -1494,7 +1643,8 @@ class MainWindow(QMainWindow):
         """Actualiza sólo la información de progreso de la pista para mayor fluidez"""
         try:
             # Si está pausada, no actualizar la posición pero mantener la visualización
-            if self.is_paused:
+            # (tampoco si la ventana está oculta: no hay nada que repintar)
+            if self.is_paused or self.isHidden():
                 return
                 
             # Si no hay pista actual, intentar usar la última información válida
@@ -1515,8 +1665,10 @@ class MainWindow(QMainWindow):
                 return
                 
             # Estimar la posición actual basado en el tiempo transcurrido desde la última actualización
+            # (una sola lectura del reloj: el mismo instante sirve de referencia para el siguiente ciclo)
+            now_ms = _now_ms()
             if hasattr(self, 'last_position_ms') and hasattr(self, 'last_position_update'):
-                elapsed_time = (QDateTime.currentMSecsSinceEpoch() - self.last_position_update)
+                elapsed_time = now_ms - self.last_position_update
                 estimated_position = self.last_position_ms + elapsed_time
                 
                 # Asegurarse de no exceder la duración total
@@ -1529,11 +1681,11 @@ class MainWindow(QMainWindow):
             # Actualizar el slider y etiquetas de tiempo
             if track_to_use.duration_ms > 0:
                 self.progress_slider.setValue(estimated_position)
-                self.time_current_label.setText(self._format_time(estimated_position))
+                self._set_current_time_text(self._format_time(estimated_position))
                 
                 # Guardar la posición estimada para la próxima actualización
                 self.last_position_ms = estimated_position
-                self.last_position_update = QDateTime.currentMSecsSinceEpoch()
+                self.last_position_update = now_ms
                 
                 # También actualizar la posición en la estructura track_to_use
                 if track_to_use == self.current_track:
@@ -83,3 +83,137 @@ class Styles:
                 border-radius: 4px;
             }
         """
+    
+    @staticmethod
+    def get_widget_style():
+        """
+        Devuelve los estilos de los elementos del widget, seleccionados por objectName,
+        para aplicarlos una sola vez sobre el widget central en lugar de en cada elemento
+        """
+        return """
+            QWidget {
+                background-color: transparent;
+            }
+            
+            QScrollArea#LyricsScrollArea {
+                border: none;
+            }
+            
+            QScrollArea#LyricsScrollArea QScrollBar:vertical {
+                background: rgba(0, 0, 0, 0.2);
+                width: 8px;
+                margin: 0px;
+            }
+            
+            QScrollArea#LyricsScrollArea QScrollBar::handle:vertical {
+                background: rgba(255, 255, 255, 0.3);
+                min-height: 20px;
+                border-radius: 4px;
+            }
+            
+            QScrollArea#LyricsScrollArea QScrollBar::add-line:vertical,
+            QScrollArea#LyricsScrollArea QScrollBar::sub-line:vertical {
+                height: 0px;
+            }
+            
+            QPushButton#TitleCloseButton, QPushButton#TitleTrayButton {
+                font-size: 12px;
+                border: none;
+                border-radius: 10px;
+                padding: 2px;
+                min-width: 20px;
+                max-width: 20px;
+                min-height: 20px;
+                max-height: 20px;
+            }
+            
+            QPushButton#TitleCloseButton {
+                color: #ffffff;
+            }
+            
+            QPushButton#TitleCloseButton[revealed="true"] {
+                background-color: rgba(180, 20, 20, 0.7);
+            }
+            
+            QPushButton#TitleCloseButton:hover {
+                background-color: rgba(220, 0, 0, 0.9);
+            }
+            
+            QPushButton#TitleTrayButton {
+                color: #cccccc;
+            }
+            
+            QPushButton#TitleTrayButton[revealed="true"] {
+                background-color: rgba(50, 50, 50, 0.7);
+            }
+            
+            QPushButton#TitleTrayButton:hover {
+                background-color: rgba(70, 70, 70, 0.9);
+            }
+            
+            QLabel#TitleLabel {
+                color: white;
+                font-size: 14px;
+                font-weight: bold;
+            }
+            
+            QLabel#ArtistLabel {
+                color: #ddd;
+                font-size: 12px;
+            }
+            
+            QLabel#AlbumLabel {
+                color: #bbb;
+                font-size: 10px;
+            }
+            
+            QLabel#LyricLine, QLabel#PlainLyricLine {
+                padding: 4px 10px;
+            }
+            
+            QLabel#LyricLine {
+                color: rgba(255, 255, 255, 0.4);
+            }
+            
+            QLabel#PlainLyricLine {
+                color: rgba(255, 255, 255, 0.7);
+            }
+            
+            QLabel#TimeLabel {
+                color: #fff;
+                font-size: 10px;
+            }
+            
+            QSlider#ProgressSlider::groove:horizontal {
+                height: 3px;
+                background: rgba(255, 255, 255, 0.2);
+                border-radius: 2px;
+            }
+            
+            QSlider#ProgressSlider::handle:horizontal {
+                width: 8px;
+                margin: -3px 0;
+                border-radius: 4px;
+                background: white;
+            }
+            
+            QSlider#ProgressSlider::sub-page:horizontal {
+                background: white;
+                border-radius: 2px;
+            }
+            
+            QPushButton#ControlButton {
+                font-size: 16px;
+                color: white;
+                background-color: rgba(0, 0, 0, 0.3);
+                border-radius: 12px;
+                min-width: 25px;
+                max-width: 25px;
+                min-height: 25px;
+                max-height: 25px;
+            }
+            
+            QPushButton#ControlButton:hover {
+                background-color: rgba(255, 255, 255, 0.2);
+            }
+        """